@@ -0,0 +1,200 @@
+"""Headless benchmarks of tab life cycle, docking and redraw throughput
+
+Drives MainWindow and DetachableTabWidget under QT_QPA_PLATFORM=offscreen.
+Every scale (number of tabs) runs in a separate process such that peak RSS
+is not inherited from the previous scale. The benchmarks of one scale build on
+each other, e.g. tabs are moved after being added, and share that process. Peak
+RSS is a high-water mark of the process, so each benchmark records both the
+peak so far (peakRssKb, cumulative) and by how much it raised it
+(peakRssIncreaseKb), which is 0 if it needed no more memory than the
+benchmarks before it. For each benchmark, wall time, these two numbers and the
+number of plot objects still alive after all tabs are removed are recorded
+and written as JSON for comparison between releases.
+
+Usage:
+    python benchmarks/benchmarks.py --scales 1 100 1000 --output results.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+
+projectDir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+pythonDir = os.path.join(projectDir, 'src', 'main', 'python')
+
+# Maximal number of windows detached at once, each one is a top level window
+maxDetached = 50
+
+
+def peakRss():
+    """Peak resident set size of this process in kB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin': # Reported in bytes on macOS
+        peak //= 1024
+    return peak
+
+
+def liveObjects():
+    """Number of live plot related objects by type name"""
+    from matplotlib.figure import Figure
+    from PlotWidgets import Mpltab, MplCanvas
+    types = {'Figure':Figure, 'MplCanvas':MplCanvas, 'Mpltab':Mpltab}
+    counts = dict.fromkeys(types, 0)
+    for obj in gc.get_objects():
+        for name, cls in types.items():
+            if isinstance(obj, cls):
+                counts[name] += 1
+    return counts
+
+
+class Runner(object):
+    def __init__(self, tabs):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        os.chdir(projectDir) # fbs locates resources relative to the project
+        sys.path.insert(0, pythonDir)
+
+        from PyQt5 import QtCore, QtWidgets
+        import main
+        self.QtCore = QtCore
+        self.QtWidgets = QtWidgets
+        self.tabs = tabs
+        self.context = main.AppContext()
+        self.window = self.context.main_window
+        self.window.resize(800, 600)
+        self.window.show()
+        self.tabWidget = self.window.tabWidget
+        self.results = []
+        self.processEvents()
+
+    def processEvents(self):
+        app = self.QtWidgets.QApplication.instance()
+        app.sendPostedEvents(None, self.QtCore.QEvent.DeferredDelete)
+        app.processEvents()
+
+    def measure(self, name, function, operations):
+        """Run function, which performs operations operations, and record the result
+
+        If function returns a number, it is recorded as the number of renders.
+        """
+        gc.collect()
+        peakBefore = peakRss()
+        start = time.perf_counter()
+        renders = function()
+        self.processEvents()
+        seconds = time.perf_counter()-start
+        peak = peakRss()
+        self.results.append({'benchmark':name, 'tabs':self.tabs, 'operations':operations,
+                             'seconds':seconds, 'secondsPerOperation':seconds/max(operations, 1),
+                             'peakRssKb':peak, 'peakRssIncreaseKb':peak-peakBefore, 'renders':renders})
+
+    def addTabs(self):
+        for _ in range(self.tabs):
+            self.tabWidget.addtab()
+
+    def moveTabs(self):
+        rng = random.Random(42)
+        for _ in range(self.tabs):
+            self.tabWidget.moveTab(rng.randrange(self.tabWidget.count()), rng.randrange(self.tabWidget.count()))
+
+    def detachAttachTabs(self):
+        point = self.QtCore.QPoint(10, 10)
+        count = min(self.tabs, maxDetached)
+        tabs = [self.tabWidget.widget(index) for index in range(count)]
+        before = [tab.canvas.renderCount for tab in tabs]
+        for tab in tabs:
+            self.tabWidget.detachTab(tab.tabId, point)
+        self.processEvents()
+        for tab in tabs:
+            tab.parent().dock()
+        self.processEvents()
+        # Undocking and docking at the same size may cost one render each at most,
+        # the first render of a tab which was never shown before included
+        renders = [tab.canvas.renderCount-count for tab, count in zip(tabs, before)]
+        if max(renders, default=0) > 2:
+            raise AssertionError('Detaching and attaching a tab rendered it {} times'.format(max(renders)))
+        return sum(renders)
+
+    def resizeWindow(self):
+        for i in range(20):
+            self.window.resize(600+10*i, 400+10*i)
+            self.processEvents()
+        # Resizes only scale the last frame, include the render at the final size
+        self.tabWidget.currentWidget().canvas.finishResize()
+        self.processEvents()
+
+    def redraw(self):
+        canvas = self.tabWidget.currentWidget().canvas
+        for _ in range(50):
+            canvas.draw()
+
+    def removeTabs(self):
+        while self.tabWidget.count():
+            self.tabWidget.removeTab(self.tabWidget.count()-1)
+
+    def run(self):
+        self.measure('addtab', self.addTabs, self.tabs)
+        self.measure('moveTab', self.moveTabs, self.tabs)
+        self.measure('detachTab+attachTab', self.detachAttachTabs, min(self.tabs, maxDetached))
+        self.measure('resize', self.resizeWindow, 20)
+        self.measure('redraw', self.redraw, 50)
+        self.measure('removeTab', self.removeTabs, self.tabs)
+
+        gc.collect()
+        self.processEvents()
+        gc.collect()
+        leaked = liveObjects() # No plot objects exist before the first tab is added
+        for result in self.results:
+            result['leakedObjects'] = leaked
+        return self.results
+
+
+def runChild(tabs):
+    results = Runner(tabs).run()
+    sys.stdout.write(json.dumps(results)+'\n')
+
+
+def runAll(scales, output=None):
+    results = []
+    for tabs in scales:
+        process = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', str(tabs)],
+                                 stdout=subprocess.PIPE, check=True, universal_newlines=True)
+        results.extend(json.loads(process.stdout.strip().splitlines()[-1]))
+
+    import matplotlib
+    from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+    report = {'meta': {'python':platform.python_version(), 'platform':platform.platform(),
+                       'qt':QT_VERSION_STR, 'pyqt':PYQT_VERSION_STR, 'matplotlib':matplotlib.__version__,
+                       'time':time.strftime('%Y-%m-%dT%H:%M:%S')},
+              'results':results}
+
+    print('{:<22s}{:>6s}{:>12s}{:>14s}{:>18s}{:>14s}{:>9s}  {}'.format('benchmark', 'tabs', 'seconds', 'ms/op', 'cum. peak RSS MB',
+          '+peak RSS MB', 'renders', 'leaked'))
+    for result in results:
+        renders = '' if result['renders'] is None else str(result['renders'])
+        print('{:<22s}{:>6d}{:>12.3f}{:>14.3f}{:>18.1f}{:>14.1f}{:>9s}  {}'.format(result['benchmark'], result['tabs'], result['seconds'],
+              1000*result['secondsPerOperation'], result['peakRssKb']/1024, result['peakRssIncreaseKb']/1024, renders,
+              result['leakedObjects']))
+
+    if not output is None:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 100, 1000], help='Numbers of tabs to benchmark')
+    parser.add_argument('--output', default=None, help='JSON file to write results to')
+    parser.add_argument('--child', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not args.child is None:
+        runChild(args.child)
+    else:
+        runAll(args.scales, args.output)
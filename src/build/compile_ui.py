@@ -0,0 +1,26 @@
+"""Compile Main.ui into the Python module Main_ui.py next to MainWindow.py
+
+Using the compiled module saves parsing the XML description with uic at every
+start of the application. MainWindow.py falls back to parsing Main.ui if the
+compiled module is missing or older than Main.ui, so this only has to be rerun
+after editing the UI.
+
+Usage:
+    python src/build/compile_ui.py
+"""
+from PyQt5 import uic
+
+from os import path
+
+
+def compileUi():
+    pythonDir = path.join(path.dirname(path.abspath(__file__)), '..', 'main', 'python')
+    uiFile = path.normpath(path.join(pythonDir, 'Main.ui'))
+    pyFile = path.normpath(path.join(pythonDir, 'Main_ui.py'))
+    with open(pyFile, 'w') as f:
+        uic.compileUi(uiFile, f)
+    return pyFile
+
+
+if __name__ == '__main__':
+    print('Compiled UI written to', compileUi())
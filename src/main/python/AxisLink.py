@@ -0,0 +1,127 @@
+from PyQt5 import QtCore, sip
+from PyQt5.QtCore import pyqtSlot
+
+import functools
+
+
+class AxisLink(QtCore.QObject):
+    """Keep the limits of axes in several MplCanvas objects in sync
+
+    Limit changes of any linked axes, e.g. while panning, are merged and sent
+    to the other axes at most maxRate times per second, only the latest limits
+    are sent. Visible canvases are updated and redrawn right away. Canvases
+    which are hidden, e.g. in a tab in the background or a minimized window,
+    are only marked and get the latest limits when they are shown again.
+
+    Kwargs:
+        - axis (str): Limits to link, 'x', 'y' or 'xy' (default 'x')
+        - maxRate (float): Maximal number of updates sent per second (default 30)
+    """
+    def __init__(self, axis='x', maxRate=30, parent=None):
+        super().__init__(parent)
+        if not axis in ['x', 'y', 'xy']:
+            raise AttributeError('axis has to be "x", "y" or "xy", got {}'.format(axis))
+        self.axis = axis
+        self._members = {} # id(canvas) -> (canvas, axes, callback ids)
+        self._limits = None # Latest limits of the group as {'x':(min, max), 'y':(min, max)}
+        self._source = None # Axes the latest limits came from
+        self._outdated = set() # id(canvas) of hidden members which have not received the latest limits
+        self._applying = False
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(int(1000/maxRate) if maxRate else 0)
+        self._timer.timeout.connect(self.sync)
+
+    def __len__(self):
+        return len(self._members)
+
+    def __contains__(self, canvas):
+        return id(canvas) in self._members
+
+    @property
+    def canvases(self):
+        return [canvas for canvas, _, _ in self._members.values()]
+
+    def add(self, canvas, axes=None):
+        """Link axes of canvas, it is given the current limits of the group, if any
+
+        Kwargs:
+            - axes (Axes): Axes to link. If None, canvas.axes is used (default None)
+        """
+        if axes is None:
+            axes = canvas.axes
+        self.remove(canvas)
+        # Apply pending autoscaling now, otherwise it fires lim_changed on the first draw as if the user changed the limits
+        axes.get_xlim()
+        axes.get_ylim()
+        callbacks = [axes.callbacks.connect(name+'lim_changed', self._on_lim_changed) for name in self.axis]
+        self._members[id(canvas)] = (canvas, axes, callbacks)
+        canvas.installEventFilter(self)
+        canvas.destroyed.connect(functools.partial(self._forget, id(canvas)))
+        if not self._limits is None:
+            self._outdated.add(id(canvas))
+            self._update(id(canvas))
+
+    def remove(self, canvas):
+        member = self._members.pop(id(canvas), None)
+        if member is None:
+            return
+        self._outdated.discard(id(canvas))
+        _, axes, callbacks = member
+        for cid in callbacks:
+            axes.callbacks.disconnect(cid)
+        if not sip.isdeleted(canvas):
+            canvas.removeEventFilter(self)
+
+    def _forget(self, key):
+        # The C++ canvas is gone, only the book keeping is left to drop
+        self._members.pop(key, None)
+        self._outdated.discard(key)
+
+    def _on_lim_changed(self, axes):
+        if self._applying:
+            return
+        self._source = axes
+        self._limits = {name:getattr(axes, 'get_'+name+'lim')() for name in self.axis}
+        if not self._timer.isActive():
+            self._timer.start()
+
+    @pyqtSlot()
+    def sync(self):
+        """Send the latest limits to all other members now"""
+        self._timer.stop()
+        if self._limits is None:
+            return
+        for key, (canvas, axes, _) in self._members.items():
+            if not axes is self._source:
+                self._outdated.add(key)
+        for key in list(self._outdated):
+            self._update(key)
+
+    def _isShown(self, canvas):
+        return canvas.isVisible() and not canvas.window().isMinimized()
+
+    def _update(self, key):
+        """Give the member the latest limits and redraw it if shown, otherwise leave it outdated"""
+        canvas, axes, _ = self._members[key]
+        if sip.isdeleted(canvas):
+            self._forget(key)
+            return
+        if not self._isShown(canvas):
+            return
+        self._outdated.discard(key)
+        self._applying = True
+        try:
+            for name, limits in self._limits.items():
+                if getattr(axes, 'get_'+name+'lim')() != limits:
+                    getattr(axes, 'set_'+name+'lim')(limits)
+        finally:
+            self._applying = False
+        canvas.draw_idle()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Show and id(obj) in self._outdated:
+            # Shown again, e.g. tab selected or window restored, update before it is painted
+            self._update(id(obj))
+        return False
@@ -0,0 +1,97 @@
+from PyQt5 import QtCore, sip
+from PyQt5.QtCore import pyqtSlot
+
+from collections import OrderedDict
+import time
+
+
+class BufferManager(QtCore.QObject):
+    """Keep the render buffers of hidden MplCanvas objects within a memory budget.
+
+    Canvases are kept in least-recently-used order. A canvas which has been
+    hidden for longer than idleTime seconds, or the least recently used hidden
+    canvases while the total buffer size exceeds budget bytes, drop their Agg
+    buffer. If compress is True, a zlib compressed snapshot of the buffer is
+    kept such that a picture of the plot is available without re-rendering.
+    Visible canvases are never evicted and re-render when shown again.
+    """
+    def __init__(self, budget=256*1024**2, idleTime=60.0, compress=True, checkInterval=5.0, parent=None):
+        super().__init__(parent)
+        self.budget = budget
+        self.idleTime = idleTime
+        self.compress = compress
+
+        self._canvases = OrderedDict() # canvas -> time it was hidden, None if visible
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self.evictIdle)
+        self._timer.start(int(checkInterval*1000))
+
+    def __len__(self):
+        return len(self._canvases)
+
+    @property
+    def bufferBytes(self):
+        """Total bytes of render buffers held by registered canvases"""
+        self._dropDeleted()
+        return sum(canvas.bufferBytes for canvas in self._canvases)
+
+    def register(self, canvas):
+        canvas.bufferManager = self
+        self._canvases[canvas] = None if canvas.isVisible() else time.monotonic()
+
+    def unregister(self, canvas):
+        self._canvases.pop(canvas, None)
+        if canvas.bufferManager is self:
+            canvas.bufferManager = None
+
+    def shown(self, canvas):
+        if canvas in self._canvases:
+            self._canvases[canvas] = None
+            self._canvases.move_to_end(canvas)
+
+    def hidden(self, canvas):
+        if canvas in self._canvases:
+            self._canvases[canvas] = time.monotonic()
+            self.enforceBudget()
+
+    def touch(self, canvas):
+        """Mark canvas as most recently used, called whenever it has (re)rendered"""
+        if canvas in self._canvases:
+            self._canvases.move_to_end(canvas)
+            self.enforceBudget()
+
+    def _hiddenCanvases(self):
+        """Registered hidden canvases, least recently used first"""
+        self._dropDeleted()
+        return [canvas for canvas, hiddenSince in self._canvases.items() if hiddenSince is not None]
+
+    def _dropDeleted(self):
+        for canvas in [canvas for canvas in self._canvases if sip.isdeleted(canvas)]:
+            del self._canvases[canvas]
+
+    def enforceBudget(self):
+        """Evict least recently used hidden canvases until the budget is met"""
+        if self.budget is None:
+            return
+        total = self.bufferBytes
+        if total <= self.budget:
+            return
+        for canvas in self._hiddenCanvases():
+            size = canvas.bufferBytes
+            if size == 0:
+                continue
+            canvas.releaseBuffer(snapshot=self.compress)
+            total -= size
+            if total <= self.budget:
+                break
+
+    @pyqtSlot()
+    def evictIdle(self):
+        """Evict canvases which have been hidden for longer than idleTime"""
+        if self.idleTime is None:
+            return
+        now = time.monotonic()
+        for canvas in self._hiddenCanvases():
+            if now-self._canvases[canvas] > self.idleTime and canvas.bufferBytes > 0:
+                canvas.releaseBuffer(snapshot=self.compress)
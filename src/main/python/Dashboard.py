@@ -0,0 +1,65 @@
+class Dashboard(object):
+    """Grid of small plots in a single MplCanvas, redrawn by blitting only the changed panels
+
+    Each panel is an axes of a fixed GridSpec with one StreamingLine. The
+    layout is set once and never recomputed, such that updates of a panel do
+    not move the others. Updates are merged like those of any stream, see
+    MplCanvas.appendData. Panels whose new data stays inside their limits are
+    blitted onto their cached background, only panels whose data leaves their
+    limits cause a full draw of the figure.
+
+    Args:
+        - canvas (MplCanvas): Canvas to lay out, its figure is cleared
+        - rows (int): Number of rows of panels
+        - columns (int): Number of columns of panels
+
+    Kwargs:
+        - titles (list): Title of each panel in row-major order. If None, panels have no titles (default None)
+        - maxLength (int): Only keep the newest maxLength samples of each panel. If None, all are kept (default None)
+        - fontSize (float): Font size of titles and tick labels (default 7)
+
+    Remaining kwargs are passed on to Figure.add_gridspec, e.g. hspace or wspace.
+    """
+    def __init__(self, canvas, rows, columns, titles=None, maxLength=None, fontSize=7, **kwargs):
+        self.canvas = canvas
+        self.rows = rows
+        self.columns = columns
+        kwargs.setdefault('left', 0.05)
+        kwargs.setdefault('right', 0.98)
+        kwargs.setdefault('bottom', 0.05)
+        kwargs.setdefault('top', 0.95)
+        kwargs.setdefault('hspace', 0.5)
+        kwargs.setdefault('wspace', 0.3)
+
+        canvas.fig.clear()
+        self.grid = canvas.fig.add_gridspec(rows, columns, **kwargs)
+        self.axes = []
+        self.streams = []
+        for number in range(rows*columns):
+            ax = canvas.fig.add_subplot(self.grid[number//columns, number%columns])
+            ax.tick_params(labelsize=fontSize)
+            if not titles is None and number < len(titles):
+                ax.set_title(titles[number], fontsize=fontSize)
+            self.axes.append(ax)
+            self.streams.append(canvas.addStream(axes=ax, maxLength=maxLength))
+        canvas.axes = self.axes[0]
+        canvas.dashboard = self
+
+    def __len__(self):
+        return len(self.streams)
+
+    def __getitem__(self, panel):
+        return self.streams[panel]
+
+    def panel(self, row, column):
+        """Number of the panel at row and column, as used by append and setData"""
+        return row*self.columns+column
+
+    def append(self, panel, y, x=None):
+        """Append single or batched samples to the line of panel"""
+        self.canvas.appendData(self.streams[panel], y, x=x)
+
+    def setData(self, panel, y, x=None):
+        """Replace the line of panel by y (and x)"""
+        self.streams[panel].setData(y, x=x)
+        self.canvas._scheduleStreamUpdate()
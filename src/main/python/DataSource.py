@@ -0,0 +1,66 @@
+import numpy as np
+
+import mmap
+from os import path
+
+
+class MemmapSource(object):
+    """Line data memory mapped from a .npy or raw binary file
+
+    Opening only maps the file, nothing is read until a view of the data is
+    requested. Plotted through MplCanvas.plotSource, each update reads the
+    samples needed for the current x-limits, at most maxSamplesPerPixel per
+    pixel, so opening takes constant time and memory is bounded by the width
+    of the canvas rather than the size of the file.
+
+    Args:
+        - fileName (str): Path to .npy file or raw binary file
+
+    Kwargs:
+        - dtype (str): Data type of raw binary files, ignored for .npy files (default 'float64')
+        - columns (int): Number of interleaved columns in raw binary files, ignored for .npy files (default 1)
+        - offset (int): Bytes to skip at the start of raw binary files, e.g. a header (default 0)
+        - yColumn (int): Column holding y values of 2D data (default 0 for 1D data, otherwise -1)
+        - xColumn (int): Column holding sorted x values of 2D data. If None, the sample index is used (default None)
+        - maxSamplesPerPixel (int): Samples read per pixel before switching to strided reading (default 512)
+    """
+    def __init__(self, fileName, dtype='float64', columns=1, offset=0, yColumn=None, xColumn=None, maxSamplesPerPixel=512):
+        self.fileName = fileName
+        self.maxSamplesPerPixel = maxSamplesPerPixel
+        # Arguments needed to open the file again, e.g. when a session is restored
+        self.options = {'dtype':np.dtype(dtype).str, 'columns':columns, 'offset':offset, 'yColumn':yColumn,
+                        'xColumn':xColumn, 'maxSamplesPerPixel':maxSamplesPerPixel}
+
+        if path.splitext(fileName)[1].lower() == '.npy':
+            self.data = np.load(fileName, mmap_mode='r')
+        else:
+            itemSize = np.dtype(dtype).itemsize
+            rows = (path.getsize(fileName)-offset)//(itemSize*columns)
+            shape = (rows,) if columns == 1 else (rows, columns)
+            self.data = np.memmap(fileName, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+        # Views are read as scattered runs, kernel read-ahead would pull in most of the file
+        fileMap = getattr(self.data, '_mmap', None)
+        if not fileMap is None and hasattr(fileMap, 'madvise') and hasattr(mmap, 'MADV_RANDOM'):
+            fileMap.madvise(mmap.MADV_RANDOM)
+
+        if self.data.ndim == 1:
+            if not xColumn is None:
+                raise AttributeError('xColumn given for 1D data in {}'.format(fileName))
+            self.y = self.data
+            self.x = None
+        elif self.data.ndim == 2:
+            if yColumn is None:
+                yColumn = -1
+            # Column views are strided views of the map, no data is read
+            self.y = self.data[:, yColumn]
+            self.x = None if xColumn is None else self.data[:, xColumn]
+        else:
+            raise AttributeError('Expected 1D or 2D data in {}, got shape {}'.format(fileName, self.data.shape))
+
+    def __len__(self):
+        return len(self.y)
+
+    @property
+    def name(self):
+        return path.basename(self.fileName)
@@ -0,0 +1,251 @@
+import numpy as np
+
+
+def _searchsorted(x, values, side, length):
+    """np.searchsorted which treats x=None as the implicit x values 0, 1, ..., length-1"""
+    if x is not None:
+        return np.searchsorted(x, values, side=side)
+    values = np.asarray(values, dtype=float)
+    if side == 'left':
+        index = np.ceil(values)
+    else:
+        index = np.floor(values)+1
+    return np.clip(index, 0, length).astype(int)
+
+
+def _take(x, start, stop):
+    """x[start:stop] where x=None is the implicit x values 0, 1, ..., length-1"""
+    if x is None:
+        return np.arange(start, stop, dtype=float)
+    return x[start:stop]
+
+
+def minMaxDecimate(x, y, nBins, xmin=None, xmax=None, yMax=None):
+    """Reduce a line to the minimum and maximum y value per x bin
+
+    The visible range [xmin, xmax] is split into nBins equally wide bins (one
+    per pixel) and each non-empty bin is represented by two points, its
+    minimum and maximum, placed at the bin centre. The nearest point outside
+    the range on each side is kept such that the line continues past the
+    edges of the axes.
+
+    Args:
+        - x (array): Sorted x values. If None, x is taken to be the sample index
+        - y (array): y values
+        - nBins (int): Number of bins, typically the axes width in pixels
+
+    Kwargs:
+        - xmin (float): Lower edge of visible range. If None, x[0] is used (default None)
+        - xmax (float): Upper edge of visible range. If None, x[-1] is used (default None)
+        - yMax (array): If given, y holds lower and yMax upper envelope of already reduced data (default None)
+
+    Returns:
+        - x (array), y (array): Decimated line
+    """
+    yMin = y
+    if yMax is None:
+        yMax = y
+    length = len(y)
+    if length == 0:
+        return _take(x, 0, 0), y
+    if xmin is None:
+        xmin = _take(x, 0, 1)[0]
+    if xmax is None:
+        xmax = _take(x, length-1, length)[0]
+    nBins = max(int(nBins), 1)
+
+    start = max(int(_searchsorted(x, xmin, 'left', length))-1, 0)
+    stop = min(int(_searchsorted(x, xmax, 'right', length))+1, length)
+
+    if stop-start <= 4*nBins: # Nothing gained by decimating
+        if yMax is yMin:
+            return _take(x, start, stop), y[start:stop]
+        yOut = np.empty(2*(stop-start))
+        yOut[0::2] = yMin[start:stop]
+        yOut[1::2] = yMax[start:stop]
+        return np.repeat(_take(x, start, stop), 2), yOut
+
+    # Points strictly inside the range are binned, the outer two are kept as is
+    innerStart = start+1 if _take(x, start, start+1)[0] < xmin else start
+    innerStop = stop-1 if _take(x, stop-1, stop)[0] > xmax else stop
+
+    edges = np.linspace(xmin, xmax, nBins+1)
+    binStart = _searchsorted(x, edges[:-1], 'left', length)
+    binStop = _searchsorted(x, edges[1:], 'left', length)
+    binStop[-1] = innerStop
+    binStart = np.clip(binStart, innerStart, innerStop)
+    binStop = np.clip(binStop, innerStart, innerStop)
+    nonEmpty = binStop > binStart
+    binStart = binStart[nonEmpty]-innerStart
+
+    # fmin/fmax ignore NaN values
+    centres = 0.5*(edges[:-1]+edges[1:])[nonEmpty]
+    xOut = np.repeat(centres, 2)
+    yOut = np.empty(2*len(centres))
+    yOut[0::2] = np.fmin.reduceat(yMin[innerStart:innerStop], binStart)
+    yOut[1::2] = np.fmax.reduceat(yMax[innerStart:innerStop], binStart)
+
+    if innerStart != start:
+        xOut = np.concatenate([_take(x, start, start+1), xOut])
+        yOut = np.concatenate([0.5*(yMin[start:start+1]+yMax[start:start+1]), yOut])
+    if innerStop != stop:
+        xOut = np.concatenate([xOut, _take(x, stop-1, stop)])
+        yOut = np.concatenate([yOut, 0.5*(yMin[stop-1:stop]+yMax[stop-1:stop])])
+    return xOut, yOut
+
+
+class DecimatedLine(object):
+    """Line artist rendering a pixel-bounded reduction of a large data set.
+
+    The full resolution arrays are kept, but only the per-pixel minimum and
+    maximum for the current x-limits are handed to the line artist. The
+    reduction is redone whenever the x-limits or the size of the axes change,
+    so the cost of drawing depends on the width of the canvas rather than on
+    the number of points.
+
+    For very long lines, block-wise minima and maxima are precomputed on first
+    use and reused whenever a pixel covers many blocks, such that zooming out
+    does not rescan the full array.
+
+    If maxSamplesPerPixel is given, e.g. for memory mapped data, the data is
+    never scanned as a whole. Views covering more than maxSamplesPerPixel
+    samples per pixel are reduced from evenly spaced runs of sampleRunLength
+    consecutive samples, which bounds the amount read per update by the width
+    of the axes at the price of possibly missing narrow peaks until zoomed in.
+    Reading runs rather than single strided samples keeps the number of file
+    pages touched low."""
+
+    blockSize = 256 # Number of samples per precomputed block
+    levelFactor = 16 # Reduction factor between successive precomputed levels
+    sampleRunLength = 64 # Consecutive samples read per run if maxSamplesPerPixel is given
+    overviewSamples = 16384 # Samples used to estimate the data range if maxSamplesPerPixel is given
+
+    def __init__(self, axes, x, y, maxSamplesPerPixel=None, **kwargs):
+        if not isinstance(y, np.ndarray):
+            y = np.asarray(y)
+        if x is not None and not isinstance(x, np.ndarray): # If None, x is the sample index which is never stored
+            x = np.asarray(x)
+        if x is not None and len(x) != len(y):
+            raise AttributeError('Length of x ({}) does not match length of y ({})'.format(len(x), len(y)))
+
+        self.axes = axes
+        self.x = x
+        self.y = y
+        self.maxSamplesPerPixel = maxSamplesPerPixel
+        self._levels = None
+
+        self.line, = axes.plot([], [], **kwargs)
+        if len(y) > 0: # An empty line leaves the data limits as they are
+            self._updateDataLimits()
+
+        self.update()
+        self._xlimCid = axes.callbacks.connect('xlim_changed', self._on_xlim_changed)
+        canvas = axes.get_figure().canvas
+        self._resizeCid = canvas.mpl_connect('resize_event', self._on_resize)
+
+    def __len__(self):
+        return len(self.y)
+
+    def _updateDataLimits(self):
+        """Make autoscaling see the full data range, not only the reduction"""
+        axes, x, y, maxSamplesPerPixel = self.axes, self.x, self.y, self.maxSamplesPerPixel
+        if maxSamplesPerPixel is None:
+            yOverview = y
+        else:
+            _, yOverview = self._sampleRuns(0, len(y), self.overviewSamples)
+        if x is None:
+            xLimits = (0, len(y)-1)
+        elif maxSamplesPerPixel is None:
+            xLimits = (np.nanmin(x), np.nanmax(x))
+        else: # x is sorted, only its ends are read
+            xLimits = (x[0], x[-1])
+        axes.update_datalim(np.array([[xLimits[0], np.nanmin(yOverview)], [xLimits[1], np.nanmax(yOverview)]]))
+        axes.autoscale_view()
+
+    @property
+    def pixelWidth(self):
+        return max(int(np.ceil(self.axes.bbox.width)), 1)
+
+    def _buildLevels(self):
+        """Precompute block minima and maxima, each level levelFactor coarser than the previous"""
+        levels = []
+        x, yMin, yMax = self.x, self.y, self.y
+        block = self.blockSize
+        while len(yMin) > block*4:
+            starts = np.arange(0, len(yMin), block)
+            x = starts.astype(float) if x is None else x[starts]
+            yMin = np.fmin.reduceat(yMin, starts)
+            yMax = np.fmax.reduceat(yMax, starts)
+            levels.append((x, yMin, yMax))
+            block = self.levelFactor
+        self._levels = levels
+
+    def decimate(self, xmin, xmax, nBins):
+        """Return the reduction of the line for the x-range [xmin, xmax] using nBins bins"""
+        start = _searchsorted(self.x, xmin, 'left', len(self))
+        stop = _searchsorted(self.x, xmax, 'right', len(self))
+        samplesPerBin = (stop-start)/nBins
+
+        if not self.maxSamplesPerPixel is None:
+            if samplesPerBin <= self.maxSamplesPerPixel:
+                return minMaxDecimate(self.x, self.y, nBins, xmin=xmin, xmax=xmax)
+            # Read evenly spaced runs, keeping one sample on either side of the view
+            x, y = self._sampleRuns(max(int(start)-1, 0), min(int(stop)+1, len(self)), nBins*self.maxSamplesPerPixel)
+            return minMaxDecimate(x, y, nBins, xmin=xmin, xmax=xmax)
+
+        if samplesPerBin < 2*self.blockSize:
+            return minMaxDecimate(self.x, self.y, nBins, xmin=xmin, xmax=xmax)
+
+        if self._levels is None:
+            self._buildLevels()
+        if not self._levels:
+            return minMaxDecimate(self.x, self.y, nBins, xmin=xmin, xmax=xmax)
+
+        # Use the coarsest level that still has a couple of blocks per bin
+        blockSamples = self.blockSize
+        level = self._levels[0]
+        for candidate in self._levels[1:]:
+            blockSamples *= self.levelFactor
+            if samplesPerBin < 2*blockSamples:
+                break
+            level = candidate
+
+        x, yMin, yMax = level
+        return minMaxDecimate(x, yMin, nBins, xmin=xmin, xmax=xmax, yMax=yMax)
+
+    def _sampleRuns(self, first, last, samples):
+        """Read about samples values from [first, last) as evenly spaced runs of consecutive samples
+
+        The first and last sample are always included. Returns in-memory x and y arrays.
+        """
+        if last <= first:
+            return _take(self.x, 0, 0), np.asarray(self.y[0:0])
+        runLength = min(self.sampleRunLength, last-first)
+        runs = max(samples//max(runLength, 1), 2)
+        starts = np.unique(np.linspace(first, last-runLength, runs).astype(np.int64))
+        index = (starts[:, np.newaxis]+np.arange(runLength)).ravel()
+        index = np.unique(np.concatenate([[first], index, [last-1]]))
+        if self.x is None:
+            x = index.astype(float)
+        else:
+            x = np.asarray(self.x[index])
+        return x, np.asarray(self.y[index])
+
+    def update(self):
+        if len(self) == 0:
+            self.line.set_data([], [])
+            return
+        xmin, xmax = sorted(self.axes.get_xlim())
+        x, y = self.decimate(xmin, xmax, self.pixelWidth)
+        self.line.set_data(x, y)
+
+    def remove(self):
+        self.axes.callbacks.disconnect(self._xlimCid)
+        self.axes.get_figure().canvas.mpl_disconnect(self._resizeCid)
+        self.line.remove()
+
+    def _on_xlim_changed(self, axes):
+        self.update()
+
+    def _on_resize(self, event):
+        self.update()
@@ -0,0 +1,129 @@
+from matplotlib import colors
+from matplotlib.image import AxesImage
+import numpy as np
+
+
+def binPoints(x, y, xmin, xmax, ymin, ymax, nx, ny):
+    """Count points per bin of an nx by ny grid spanning [xmin, xmax] x [ymin, ymax]
+
+    Points outside the range are ignored. Returns an (ny, nx) integer array
+    with row 0 at ymin, as expected by an image with origin='lower'.
+    """
+    mask = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+    xv, yv = x[mask], y[mask]
+    ix = ((xv-xmin)*(nx/(xmax-xmin))).astype(np.intp)
+    iy = ((yv-ymin)*(ny/(ymax-ymin))).astype(np.intp)
+    # Points on the upper edges belong to the last bin
+    np.minimum(ix, nx-1, out=ix)
+    np.minimum(iy, ny-1, out=iy)
+    return np.bincount(iy*nx+ix, minlength=nx*ny).reshape(ny, nx)
+
+
+class _DensityImage(AxesImage):
+    """Image re-binning its scatter for the current view whenever it is drawn"""
+    def __init__(self, scatter, axes, **kwargs):
+        super().__init__(axes, **kwargs)
+        self._scatter = scatter
+
+    def draw(self, renderer):
+        # Drawn before the markers (lower zorder), which are updated here as well
+        self._scatter.update()
+        super().draw(renderer)
+
+
+class DensityScatter(object):
+    """Scatter plot rendering a per-pixel 2D histogram when many points are visible.
+
+    On every draw of a changed view, the points inside the view are counted.
+    If there are more than maxMarkers, they are binned into a histogram with
+    one bin per binSize screen pixels and shown as an image covering the axes,
+    so the cost of drawing depends on the size of the canvas rather than on
+    the number of points. Otherwise the visible points are drawn as markers.
+    Empty bins are transparent. Only linear axes are supported.
+
+    Args:
+        - axes (Axes): Axes to plot in
+        - x (array): x values
+        - y (array): y values
+
+    Kwargs:
+        - maxMarkers (int): Largest number of visible points drawn as markers (default 10000)
+        - binSize (int): Screen pixels per histogram bin along both axes (default 1)
+        - cmap (str or Colormap): Colour map of the histogram (default 'viridis')
+        - norm (str or Normalize): Mapping of counts to colours, 'log', 'linear' or a Normalize instance (default 'log')
+
+    Remaining kwargs are passed on to axes.scatter.
+    """
+    def __init__(self, axes, x, y, maxMarkers=10000, binSize=1, cmap='viridis', norm='log', **kwargs):
+        if not isinstance(x, np.ndarray):
+            x = np.asarray(x)
+        if not isinstance(y, np.ndarray):
+            y = np.asarray(y)
+        if len(x) != len(y):
+            raise AttributeError('Length of x ({}) does not match length of y ({})'.format(len(x), len(y)))
+        self.axes = axes
+        self.x = x
+        self.y = y
+        self.maxMarkers = maxMarkers
+        self.binSize = binSize
+        self._view = None # Limits and bins of the current histogram or markers
+
+        if norm == 'log':
+            norm = colors.LogNorm()
+        elif norm == 'linear':
+            norm = colors.Normalize()
+        # The image always spans the whole axes, histograms are binned for the current view
+        self.image = _DensityImage(self, axes, cmap=cmap, norm=norm, origin='lower', interpolation='nearest',
+                                   extent=(0, 1, 0, 1), transform=axes.transAxes)
+        self.image.set_data(np.ma.masked_all((1, 1)))
+        axes.add_image(self.image)
+        self.markers = axes.scatter([], [], **kwargs)
+
+        if len(x):
+            axes.update_datalim(np.array([[np.nanmin(x), np.nanmin(y)], [np.nanmax(x), np.nanmax(y)]]))
+            axes.autoscale_view()
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def binned(self):
+        """True if the histogram is shown, False if markers are"""
+        return self.image.get_visible()
+
+    def update(self):
+        """Re-bin or select markers if the view or the size of the axes changed"""
+        xlim = self.axes.get_xlim()
+        ylim = self.axes.get_ylim()
+        nx = max(int(self.axes.bbox.width)//self.binSize, 1)
+        ny = max(int(self.axes.bbox.height)//self.binSize, 1)
+        view = (xlim, ylim, nx, ny)
+        if view == self._view:
+            return
+        self._view = view
+
+        xmin, xmax = sorted(xlim)
+        ymin, ymax = sorted(ylim)
+        mask = (self.x >= xmin) & (self.x <= xmax) & (self.y >= ymin) & (self.y <= ymax)
+        visible = np.count_nonzero(mask)
+        if visible <= self.maxMarkers or xmax <= xmin or ymax <= ymin:
+            self.markers.set_offsets(np.column_stack([self.x[mask], self.y[mask]]))
+            self.markers.set_visible(True)
+            self.image.set_visible(False)
+            return
+
+        counts = binPoints(self.x[mask], self.y[mask], xmin, xmax, ymin, ymax, nx, ny)
+        # Axes coordinates run from the first to the second limit, which may be inverted
+        if xlim[0] > xlim[1]:
+            counts = counts[:, ::-1]
+        if ylim[0] > ylim[1]:
+            counts = counts[::-1]
+        self.image.set_data(np.ma.masked_equal(counts, 0))
+        self.image.set_clim(1 if isinstance(self.image.norm, colors.LogNorm) else 0, max(counts.max(), 1))
+        self.image.set_visible(True)
+        self.markers.set_offsets(np.empty((0, 2)))
+        self.markers.set_visible(False)
+
+    def remove(self):
+        self.image.remove()
+        self.markers.remove()
@@ -0,0 +1,174 @@
+from PyQt5 import QtCore
+from PyQt5.QtCore import pyqtSignal, pyqtSlot
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import re
+import traceback
+
+
+class _FigureBuilder(object):
+    """Stand-in for MplCanvas providing the plot methods used by Session.restoreCanvas on a plain Agg figure"""
+    def __init__(self, width, height, dpi):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        self.fig = Figure(figsize=(width/dpi, height/dpi), dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.axes = self.fig.add_subplot(111)
+        self.pyramidImages = []
+
+    def plotDecimated(self, x, y, axes=None, **kwargs):
+        from Decimation import DecimatedLine
+        return DecimatedLine(self.axes if axes is None else axes, x, y, **kwargs)
+
+    def plotSource(self, source, axes=None, **kwargs):
+        return self.plotDecimated(source.x, source.y, axes=axes, maxSamplesPerPixel=source.maxSamplesPerPixel, **kwargs)
+
+    def plotDensity(self, x, y, axes=None, **kwargs):
+        from DensityScatter import DensityScatter
+        return DensityScatter(self.axes if axes is None else axes, x, y, **kwargs)
+
+    def plotImage(self, image, axes=None, **kwargs):
+        from ImagePyramid import PyramidImage
+        pyramidImage = PyramidImage(self.axes if axes is None else axes, image, **kwargs)
+        self.pyramidImages.append(pyramidImage)
+        return pyramidImage
+
+    def addStream(self, axes=None, maxLength=None, **kwargs):
+        return (self.axes if axes is None else axes, kwargs)
+
+    def appendData(self, stream, y, x=None):
+        axes, kwargs = stream
+        axes.plot(y if x is None else x, y, **kwargs)
+
+    def save(self, fileName, format=None):
+        for pyramidImage in self.pyramidImages: # Export the averaged levels, not the strided previews
+            pyramidImage.pyramid.wait()
+            pyramidImage._crop = None
+            pyramidImage.update()
+        self.fig.savefig(fileName, format=format)
+
+
+def exportFigure(state, arrays, fileName, width, height, dpi, format=None):
+    """Rebuild a plot from its session state and arrays and save it to fileName, run in a worker process"""
+    builder = _FigureBuilder(width, height, dpi)
+    if state.get('random'): # Placeholder of a random plot which was never shown
+        import numpy as np
+        builder.axes.plot(np.random.rand(10), np.random.rand(10))
+    else:
+        from Session import restoreCanvas
+        restoreCanvas(arrays, state, builder)
+    builder.save(fileName, format=format)
+    return fileName
+
+
+def exportFileName(directory, plotId, name, format):
+    """File name for a plot, unique by plotId and free of characters not allowed in file names"""
+    name = re.sub(r'[^\w\-. ]+', '_', name).strip() or 'plot'
+    return os.path.join(directory, '{:03d} {}.{}'.format(plotId, name, format))
+
+
+class BatchExporter(QtCore.QObject):
+    """Export plots in a pool of worker processes while the GUI stays responsive
+
+    The state of each plot, as saved in a session, is taken in the GUI thread
+    right before it is handed to a worker, which rebuilds the figure from it
+    and saves it. Only a few plots more than there are workers are in flight at
+    a time, so the data of all plots is never copied at once.
+
+    Signals:
+        - progress(int, int): Number of finished and total plots
+        - finished(list): (fileName, error message) of failed exports, empty if all succeeded
+    """
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(list)
+    _done = pyqtSignal(object) # Future, emitted from the thread of the executor
+
+    def __init__(self, maxWorkers=None, parent=None):
+        super().__init__(parent)
+        self.maxWorkers = maxWorkers or os.cpu_count() or 1
+        self._executor = None
+        self._jobs = []
+        self._futures = {}
+        self._completed = 0
+        self._total = 0
+        self._errors = []
+        self._cancelled = False
+        self._done.connect(self._on_done)
+
+    @property
+    def isRunning(self):
+        return not self._executor is None
+
+    def start(self, jobs):
+        """Export jobs, a list of (tab, fileName, format, dpi)"""
+        if self.isRunning:
+            raise RuntimeError('Export already running')
+        self._jobs = list(jobs)
+        self._total = len(self._jobs)
+        self._completed = 0
+        self._errors = []
+        self._cancelled = False
+        # Forking a process running Qt is unsafe, workers are started fresh
+        self._executor = ProcessPoolExecutor(max_workers=self.maxWorkers, mp_context=multiprocessing.get_context('spawn'))
+        self.progress.emit(0, self._total)
+        for _ in range(2*self.maxWorkers):
+            self._submitNext()
+        if not self._futures:
+            self._finish()
+
+    def cancel(self):
+        """Skip all plots not yet started, plots being exported are finished"""
+        self._cancelled = True
+        self._jobs = []
+        for future in list(self._futures):
+            future.cancel()
+
+    def _submitNext(self):
+        from Session import ArchiveWriter, plotState
+        from PyQt5 import sip
+        while self._jobs:
+            tab, fileName, format, dpi = self._jobs.pop(0)
+            if sip.isdeleted(tab): # Closed since the export started
+                self._completed += 1
+                continue
+            writer = ArchiveWriter()
+            try:
+                state = plotState(tab, writer)
+                if tab.realized:
+                    width, height = tab.canvas.get_width_height(physical=True)
+                    figureDpi = tab.canvas.figure.dpi
+                else:
+                    width, height, figureDpi = 500, 400, 100 # Size of a new MplCanvas
+                dpi = figureDpi if dpi is None else dpi
+                future = self._executor.submit(exportFigure, state, writer.arrays, fileName,
+                                               width*dpi/figureDpi, height*dpi/figureDpi, dpi, format)
+            except Exception as e:
+                self._completed += 1
+                self._errors.append((fileName, '{}: {}'.format(type(e).__name__, e)))
+                continue
+            self._futures[future] = fileName
+            future.add_done_callback(self._done.emit)
+            return
+
+    @pyqtSlot(object)
+    def _on_done(self, future):
+        fileName = self._futures.pop(future, None)
+        if fileName is None:
+            return
+        self._completed += 1
+        if not future.cancelled():
+            error = future.exception()
+            if not error is None:
+                self._errors.append((fileName, ''.join(traceback.format_exception_only(type(error), error)).strip()))
+        self.progress.emit(self._completed, self._total)
+        self._submitNext()
+        if not self._futures:
+            self._finish()
+
+    def _finish(self):
+        executor, self._executor = self._executor, None
+        if not executor is None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.finished.emit(self._errors)
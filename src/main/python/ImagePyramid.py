@@ -0,0 +1,290 @@
+from PyQt5 import QtCore
+from PyQt5.QtCore import pyqtSignal
+
+import numpy as np
+
+from os import path
+import glob
+import hashlib
+import json
+import mmap
+import os
+import threading
+import traceback
+
+
+def downsample(image, rowChunk=1024):
+    """Halve both image dimensions by averaging 2x2 blocks, an odd last row or column is dropped
+
+    Rows are read in chunks of rowChunk output rows, so memory mapped images
+    are streamed rather than read as a whole. Grey scale images are averaged
+    as float32, colour images (3D) keep their dtype.
+    """
+    rows, columns = image.shape[0]//2, image.shape[1]//2
+    dtype = image.dtype if image.ndim == 3 else np.float32
+    out = np.empty((rows, columns)+image.shape[2:], dtype=dtype)
+    for start in range(0, rows, rowChunk):
+        stop = min(start+rowChunk, rows)
+        block = np.asarray(image[2*start:2*stop, :2*columns], dtype=np.float32)
+        out[start:stop] = block.reshape((stop-start, 2, columns, 2)+image.shape[2:]).mean(axis=(1, 3))
+    return out
+
+
+class ImagePyramid(QtCore.QObject):
+    """Successively halved copies of a large image, built in a background thread
+
+    Level 0 is the image itself, level k is 2**k times smaller along both axes.
+    Levels are built until the larger side is at most minSize pixels. Until a
+    level is built, level returns a strided view of the image instead, which
+    is cheap to read but aliases.
+
+    If cacheDir is given, levels are stored there as .npy files, one per level,
+    and memory mapped instead of being rebuilt the next time the same image is
+    opened with the same cacheDir. The image is identified by file, position,
+    size and modification time for memory mapped images and by a hash of its
+    data otherwise, levels cached for another image are deleted.
+
+    Args:
+        - image (array): 2D, or 3D colour, image. Memory mapped arrays are not read into memory
+
+    Kwargs:
+        - cacheDir (str): Directory to store and reuse levels in. If None, levels are kept in memory only (default None)
+        - minSize (int): Stop when the larger side of a level is at most this many pixels (default 512)
+        - start (bool): Start building right away (default True)
+    """
+    levelReady = pyqtSignal(int)
+
+    def __init__(self, image, cacheDir=None, minSize=512, start=True, parent=None):
+        super().__init__(parent)
+        if not isinstance(image, np.ndarray):
+            image = np.asarray(image)
+        if not image.ndim in [2, 3]:
+            raise AttributeError('Expected a 2D or 3D image, got shape {}'.format(image.shape))
+        self.image = image
+        self.cacheDir = cacheDir
+        self.minSize = minSize
+
+        shape = image.shape[:2]
+        self.shapes = [shape]
+        while max(shape) > minSize and min(shape) >= 2:
+            shape = (shape[0]//2, shape[1]//2)
+            self.shapes.append(shape)
+        self._levels = [image]+[None]*(len(self.shapes)-1)
+
+        self._cancelled = False
+        self._thread = None
+        if start:
+            self.start()
+
+    def __len__(self):
+        return len(self.shapes)
+
+    @property
+    def isBuilt(self):
+        return all(not level is None for level in self._levels)
+
+    def start(self):
+        if not self._thread is None or self.isBuilt:
+            return
+        self._thread = threading.Thread(target=self._build, name='ImagePyramid', daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Stop building after the level currently being built"""
+        self._cancelled = True
+
+    def wait(self, timeout=None):
+        if not self._thread is None:
+            self._thread.join(timeout)
+
+    def level(self, number):
+        """Image at level number, a strided view of the image if it is not built yet
+
+        Returns:
+            - array, bool: Image and whether it is the averaged level
+        """
+        level = self._levels[number]
+        if not level is None:
+            return level, True
+        step = 2**number
+        rows, columns = self.shapes[number]
+        return self.image[:rows*step:step, :columns*step:step], False
+
+    def levelFor(self, pixelsPerScreenPixel):
+        """Coarsest level still showing at least one image pixel per screen pixel"""
+        if pixelsPerScreenPixel <= 1:
+            return 0
+        return int(min(np.floor(np.log2(pixelsPerScreenPixel)), len(self)-1))
+
+    @property
+    def nbytes(self):
+        """Bytes held in memory by built levels, memory mapped levels and the image itself are not counted"""
+        return sum(level.nbytes for level in self._levels[1:] if not level is None and not isinstance(level, np.memmap))
+
+    def _cacheFile(self, number):
+        return path.join(self.cacheDir, 'level{}.npy'.format(number))
+
+    def _cacheKey(self):
+        """Identity of the image, levels are only reused from a cacheDir holding the same key"""
+        image = self.image
+        key = {'shape':list(image.shape), 'dtype':image.dtype.str}
+        buffer = getattr(image, '_mmap', None)
+        if isinstance(image, np.memmap) and not buffer is None and not image.filename is None:
+            # Views of a memory mapped array keep the offset of the array they were taken from
+            start = image.offset-image.offset%mmap.ALLOCATIONGRANULARITY
+            position = start+image.ctypes.data-np.frombuffer(buffer, dtype=np.uint8).ctypes.data
+            stat = os.stat(image.filename)
+            key.update({'file':path.abspath(image.filename), 'position':int(position), 'strides':list(image.strides),
+                        'size':stat.st_size, 'mtime':stat.st_mtime_ns})
+        else:
+            digest = hashlib.blake2b(digest_size=16)
+            for start in range(0, image.shape[0], 1024):
+                digest.update(np.ascontiguousarray(image[start:start+1024]).data)
+            key['digest'] = digest.hexdigest()
+        return key
+
+    def _prepareCache(self):
+        """Delete cached levels of another image and record the key of this one"""
+        os.makedirs(self.cacheDir, exist_ok=True)
+        key = self._cacheKey()
+        keyFile = path.join(self.cacheDir, 'key.json')
+        try:
+            with open(keyFile) as f:
+                if json.load(f) == key:
+                    return
+        except (OSError, ValueError):
+            pass
+        for fileName in glob.glob(path.join(self.cacheDir, 'level*.npy')):
+            os.remove(fileName)
+        with open(keyFile, 'w') as f:
+            json.dump(key, f)
+
+    def _loadCached(self, number):
+        if self.cacheDir is None or not path.exists(self._cacheFile(number)):
+            return None
+        try:
+            level = np.load(self._cacheFile(number), mmap_mode='r')
+        except (ValueError, OSError):
+            return None
+        if level.shape[:2] != self.shapes[number] or level.shape[2:] != self.image.shape[2:]:
+            return None # Cached for another image
+        return level
+
+    def _build(self):
+        try:
+            if not self.cacheDir is None:
+                self._prepareCache()
+            for number in range(1, len(self)):
+                if self._cancelled:
+                    return
+                level = self._loadCached(number)
+                if level is None:
+                    level = downsample(self._levels[number-1])
+                    if not self.cacheDir is None:
+                        np.save(self._cacheFile(number), level)
+                self._levels[number] = level
+                self.levelReady.emit(number)
+        except Exception:
+            traceback.print_exc()
+
+
+class PyramidImage(object):
+    """Image artist showing only the part of an ImagePyramid level matching the view.
+
+    For the current limits and size of the axes, the coarsest level with at
+    least one image pixel per screen pixel is chosen and only the tiles of it
+    overlapping the view are handed to the image artist. Crops are aligned to
+    tileSize such that panning within the current tiles does not replace the
+    data. The amount of data drawn per update is thereby bounded by the size
+    of the canvas, not by the size of the image.
+
+    Colour limits are fixed from the coarsest level when created, unless vmin
+    and vmax are given, such that colours do not change while zooming.
+    """
+    tileSize = 256 # Pixels per side of the tiles crops are aligned to
+
+    def __init__(self, axes, image, cacheDir=None, minSize=512, **kwargs):
+        if isinstance(image, ImagePyramid):
+            self.pyramid = image
+        else:
+            self.pyramid = ImagePyramid(image, cacheDir=cacheDir, minSize=minSize)
+        self.axes = axes
+        self.data = self.pyramid.image
+        self._crop = None # (level, averaged, row start, row stop, column start, column stop) currently shown
+
+        rows, columns = self.pyramid.shapes[0]
+        if self.data.ndim == 2 and (kwargs.get('vmin') is None or kwargs.get('vmax') is None):
+            overview, _ = self.pyramid.level(len(self.pyramid)-1)
+            kwargs.setdefault('vmin', np.nanmin(overview))
+            kwargs.setdefault('vmax', np.nanmax(overview))
+        kwargs.setdefault('origin', 'upper')
+        if kwargs['origin'] != 'upper':
+            raise AttributeError('Only origin="upper" is supported')
+        self.artist = axes.imshow(np.zeros((1, 1)+self.data.shape[2:], dtype=self.data.dtype), **kwargs)
+        axes.set_xlim(-0.5, columns-0.5)
+        axes.set_ylim(rows-0.5, -0.5)
+
+        self.update()
+        self._xlimCid = axes.callbacks.connect('xlim_changed', self._on_lim_changed)
+        self._ylimCid = axes.callbacks.connect('ylim_changed', self._on_lim_changed)
+        canvas = axes.get_figure().canvas
+        self._resizeCid = canvas.mpl_connect('resize_event', self._on_resize)
+        self.pyramid.levelReady.connect(self._on_level_ready)
+
+    @property
+    def level(self):
+        """Level currently shown, None before the first update"""
+        return None if self._crop is None else self._crop[0]
+
+    def update(self):
+        rows, columns = self.pyramid.shapes[0]
+        xmin, xmax = sorted(self.axes.get_xlim())
+        ymin, ymax = sorted(self.axes.get_ylim())
+        # Image pixel edges are at -0.5, 0.5, ..., clip the view to the image
+        left, right = max(xmin+0.5, 0), min(xmax+0.5, columns)
+        top, bottom = max(ymin+0.5, 0), min(ymax+0.5, rows)
+        if right <= left or bottom <= top:
+            return
+
+        width = max(self.axes.bbox.width, 1)
+        height = max(self.axes.bbox.height, 1)
+        number = self.pyramid.levelFor(min((right-left)/width, (bottom-top)/height))
+        level, averaged = self.pyramid.level(number)
+        scale = 2**number
+        levelRows, levelColumns = self.pyramid.shapes[number]
+
+        tile = self.tileSize
+        rowStart = int(top//scale)//tile*tile
+        rowStop = min(int(np.ceil(np.ceil(bottom/scale)/tile))*tile, levelRows)
+        columnStart = int(left//scale)//tile*tile
+        columnStop = min(int(np.ceil(np.ceil(right/scale)/tile))*tile, levelColumns)
+        crop = (number, averaged, rowStart, rowStop, columnStart, columnStop)
+        if crop == self._crop:
+            return
+        self._crop = crop
+
+        self.artist.set_data(np.ascontiguousarray(level[rowStart:rowStop, columnStart:columnStop]))
+        self.artist.set_extent((columnStart*scale-0.5, columnStop*scale-0.5, rowStop*scale-0.5, rowStart*scale-0.5))
+
+    def remove(self):
+        self.pyramid.cancel()
+        try:
+            self.pyramid.levelReady.disconnect(self._on_level_ready)
+        except TypeError: # Already disconnected
+            pass
+        self.axes.callbacks.disconnect(self._xlimCid)
+        self.axes.callbacks.disconnect(self._ylimCid)
+        self.axes.get_figure().canvas.mpl_disconnect(self._resizeCid)
+        self.artist.remove()
+
+    def _on_lim_changed(self, axes):
+        self.update()
+
+    def _on_resize(self, event):
+        self.update()
+
+    def _on_level_ready(self, number):
+        # Replace the strided view of the shown level by the averaged one
+        if not self._crop is None and self._crop[0] == number and not self._crop[1]:
+            self.update()
+            self.axes.get_figure().canvas.draw_idle()
@@ -0,0 +1,152 @@
+from PyQt5 import QtCore
+
+from collections import deque
+import json
+import time
+import weakref
+
+
+class CanvasStats(object):
+    """Draw statistics of one MplCanvas
+
+    Kinds of draws are 'full' (whole figure rendered by Agg), 'blit' (only
+    animated artists drawn onto cached backgrounds) and 'async' (frame rendered
+    by a RenderEngine, timed from submission to arrival in the GUI thread).
+
+    Kwargs:
+        - plotId (int): ID of the plot, None if not known (default None)
+        - history (int): Number of recent draws used for the mean draw time and FPS (default 60)
+    """
+    def __init__(self, plotId=None, history=60):
+        self.plotId = plotId
+        self.counts = {'full':0, 'blit':0, 'async':0}
+        self.lastDrawTime = 0.0
+        self._recent = deque(maxlen=history) # (time stamp, seconds)
+        self.listener = None # Called with (stats, kind, seconds) after every draw
+
+    def recordDraw(self, kind, seconds):
+        self.counts[kind] += 1
+        self.lastDrawTime = seconds
+        self._recent.append((time.perf_counter(), seconds))
+        if not self.listener is None:
+            self.listener(self, kind, seconds)
+
+    @property
+    def drawCount(self):
+        return sum(self.counts.values())
+
+    @property
+    def meanDrawTime(self):
+        """Mean seconds per draw of the recent draws"""
+        if not self._recent:
+            return 0.0
+        return sum(seconds for _, seconds in self._recent)/len(self._recent)
+
+    @property
+    def fps(self):
+        """Frames per second over the recent draws, 0 if idle for more than a second"""
+        if len(self._recent) < 2 or time.perf_counter()-self._recent[-1][0] > 1.0:
+            return 0.0
+        return (len(self._recent)-1)/max(self._recent[-1][0]-self._recent[0][0], 1e-9)
+
+    def record(self, canvas=None):
+        """Statistics as a dict, including buffer bytes and artist count if canvas is given"""
+        record = {'plotId':self.plotId, 'time':time.time(), 'drawCount':self.drawCount,
+                  'fullCount':self.counts['full'], 'blitCount':self.counts['blit'], 'asyncCount':self.counts['async'],
+                  'lastDrawTime':self.lastDrawTime, 'meanDrawTime':self.meanDrawTime, 'fps':self.fps}
+        if not canvas is None:
+            record['bufferBytes'] = canvas.bufferBytes
+            record['artistCount'] = canvas.artistCount
+        return record
+
+    def text(self, canvas=None):
+        """One line summary as shown in the overlay of the canvas"""
+        parts = ['draw {:.1f} ms'.format(1000*self.meanDrawTime),
+                 'full {} blit {}'.format(self.counts['full']+self.counts['async'], self.counts['blit']),
+                 '{:.1f} fps'.format(self.fps)]
+        if not canvas is None:
+            parts.append('{:.1f} MB'.format(canvas.bufferBytes/1024**2))
+            parts.append('{} artists'.format(canvas.artistCount))
+        return ' | '.join(parts)
+
+
+class Instrumentation(QtCore.QObject):
+    """Collect draw statistics of all plots of a DetachableTabWidget
+
+    Every draw of an attached canvas is passed to the listeners as a dict,
+    see CanvasStats.record, which includes plotId, kind and seconds of the
+    draw. startLog writes these as JSON lines to a file for long runs.
+    """
+    def __init__(self, history=60, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self._stats = weakref.WeakValueDictionary() # plotId -> CanvasStats, owned by the canvas
+        self._canvases = weakref.WeakValueDictionary() # plotId -> MplCanvas
+        self._listeners = []
+        self._logFile = None
+
+    def attach(self, plotId, canvas):
+        """Record the draws of canvas, the statistics of its overlay are kept if it already has some"""
+        stats = canvas.stats
+        if stats is None:
+            stats = CanvasStats(history=self.history)
+            canvas.stats = stats
+        stats.plotId = plotId
+        stats.listener = self._on_draw
+        self._stats[plotId] = stats
+        self._canvases[plotId] = canvas
+
+    def detachAll(self):
+        for plotId, canvas in list(self._canvases.items()):
+            stats = canvas.stats
+            if not stats is None:
+                stats.listener = None
+                if not canvas.showStats: # Keep statistics shown in the overlay
+                    canvas.stats = None
+        self._stats.clear()
+        self._canvases.clear()
+
+    def stats(self, plotId):
+        return self._stats.get(plotId)
+
+    def summary(self):
+        """List of statistics of all attached plots"""
+        return [stats.record(self._canvases.get(plotId)) for plotId, stats in sorted(self._stats.items())]
+
+    def export(self, fileName):
+        """Write the summary of all plots as JSON to fileName"""
+        with open(fileName, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def addListener(self, listener):
+        """Call listener with a dict of statistics after every draw of an attached canvas"""
+        self._listeners.append(listener)
+
+    def removeListener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def startLog(self, fileName):
+        """Append a JSON line per draw to fileName until stopLog is called"""
+        self.stopLog()
+        self._logFile = open(fileName, 'a')
+        self.addListener(self._writeLog)
+
+    def stopLog(self):
+        if self._logFile is None:
+            return
+        self.removeListener(self._writeLog)
+        self._logFile.close()
+        self._logFile = None
+
+    def _writeLog(self, record):
+        self._logFile.write(json.dumps(record)+'\n')
+
+    def _on_draw(self, stats, kind, seconds):
+        if not self._listeners:
+            return
+        record = stats.record(self._canvases.get(stats.plotId))
+        record['kind'] = kind
+        record['seconds'] = seconds
+        for listener in list(self._listeners):
+            listener(record)
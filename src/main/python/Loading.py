@@ -0,0 +1,53 @@
+from PyQt5 import QtCore
+from PyQt5.QtCore import pyqtSignal
+
+import inspect
+import threading
+import traceback
+
+
+class LoadSignals(QtCore.QObject):
+    """Signals of a LoadTask, which as a QRunnable cannot emit signals itself"""
+    done = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class LoadTask(QtCore.QRunnable):
+    """Run loader in a QThreadPool and deliver its result in the GUI thread
+
+    If loader accepts a keyword argument cancelled, it is given a
+    threading.Event which is set once the task is cancelled, such that long
+    loads can stop early. The result of a cancelled task is dropped without
+    being delivered.
+
+    Args:
+        - loader (callable): Returns the data to plot
+    """
+    def __init__(self, loader):
+        super().__init__()
+        self.setAutoDelete(False) # Kept alive by its owner until delivered or cancelled
+        self.loader = loader
+        self.signals = LoadSignals()
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        if self.cancelled.is_set():
+            return
+        try:
+            try:
+                acceptsCancelled = 'cancelled' in inspect.signature(self.loader).parameters
+            except (TypeError, ValueError): # Builtins without a signature
+                acceptsCancelled = False
+            if acceptsCancelled:
+                result = self.loader(cancelled=self.cancelled)
+            else:
+                result = self.loader()
+        except Exception:
+            if not self.cancelled.is_set():
+                self.signals.failed.emit(traceback.format_exc())
+            return
+        if not self.cancelled.is_set():
+            self.signals.done.emit(result)
@@ -1,92 +1,24 @@
-from PyQt5 import QtGui, QtCore, QtWidgets, uic
+from PyQt5 import QtGui, QtCore, QtWidgets
 from PyQt5.QtCore import pyqtSignal, pyqtSlot
 
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg,NavigationToolbar2QT as NavigationToolbar
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
-import numpy as np
-
 from os import path
+import functools
+import sys
 
+from BufferManager import BufferManager
+from PlotRegistry import PlotRegistry
 
-class Mpltab(QtWidgets.QWidget):
-    """ Widget to keep track of mpl figure in tab"""
-    def __init__(self,MplCanvas, plotId, tabId, mainWindow, parent=None, toolbar=True, docked=True, dockingIcon=None, unDockingIcon=None):
-        super().__init__(parent=parent)
-
-        # Save both plotId and tabId
-        self.plotId = plotId
-        self.tabId = tabId
-
-        # If docked, as standard the Mpltab is created as docked in a DetachableTabWidget
-        self.docked=docked
-        self.mainWindow = mainWindow
-
-        self.layout = QtWidgets.QVBoxLayout()
-        self.layout.setContentsMargins(0,0,0,0) # Remove border around layout
+# Matplotlib, NumPy and everything plotting related is only imported once the
+# first plot is created, see DetachableTabWidget._createCanvas. Mpltab and
+# MplCanvas are still reachable as attributes of this module.
+def __getattr__(name):
+    if name in ['Mpltab', 'MplCanvas']:
+        import PlotWidgets
+        return getattr(PlotWidgets, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
-        self.dockingIcon = dockingIcon
-        self.unDockingIcon = unDockingIcon
-        
-        if toolbar: # If a toolbar is wanted, create it, otherwise create menubar above figure
-            self.menubar = NavigationToolbar(MplCanvas, None)
-        else:
-            self.menubar = QtWidgets.QMenuBar(self)
-            self.menubar.setFixedHeight(25)
-
-        # ad menubar and canvas to layout
-        self.layout.addWidget(self.menubar)
-        self.layout.addWidget(MplCanvas)
-        if not self.dockingIcon is None and not self.unDockingIcon is None:
-            self.dockAction = QtWidgets.QAction(self.unDockingIcon,'Undock',self.menubar)
-        else:
-            self.dockAction = QtWidgets.QAction('Undock',self.menubar)
-        
-        if not self.docked: # start undocked
-            self.undock(parent=self.parent)
-
-        self.setLayout(self.layout)
-
-        # Add shortcut to dock
-        self.dockAction.setShortcut("Ctrl+D")
-        self.menubar.addAction(self.dockAction)
-        self.dockAction.triggered.connect(self.toggleDocked)
-
-    def toggleDocked(self):
-        if self.docked:
-            self.parent().parent().detachTab(index=self.tabId,point=QtGui.QCursor().pos())
-        else:
-            parent = self.parent()
-            parent.dock()#attachTab(parent.contentWidget, parent.objectName(), parent.windowIcon())
-            
-
-
-    def undock(self,newParent):
-        self.docked = False
-        self.dockAction.setText('Dock')
-        if not self.dockingIcon is None and not self.unDockingIcon is None:
-            self.dockAction.setIcon(self.dockingIcon)
-        self.setParent(newParent)
-        
-
-    def dock(self,newParent):
-        self.docked = True
-        self.dockAction.setText('Undock')
-        if not self.dockingIcon is None and not self.unDockingIcon is None:
-            self.dockAction.setIcon(self.unDockingIcon)
-        self.setParent(newParent)
-
-
-class MplCanvas(FigureCanvasQTAgg):
-    """Simple Matplotlib class"""
-    def __init__(self, parent=None, width=5, height=4, dpi=100):
-        self.fig = Figure(figsize=(width, height), dpi=dpi)
-        self.axes = self.fig.add_subplot(111)
-        super(MplCanvas, self).__init__(self.fig)
-
-    # Upon deletion, also close the figure
-    def __del__(self):
-        plt.close(self.fig)
+# Default of keyword arguments which are left as they are unless given, for which None is a valid value
+_unchanged = object()
 
 
 ##
@@ -105,6 +37,8 @@ class MplCanvas(FigureCanvasQTAgg):
 #   Re-ordering (moving) tabs by dragging was re-implemented  
 #   
 class DetachableTabWidget(QtWidgets.QTabWidget):
+    plotsChanged = pyqtSignal() # Plots were added, removed, moved, detached or attached
+
     def __init__(self, parent=None,app=None):
         QtWidgets.QTabWidget.__init__(self, parent)
 
@@ -116,7 +50,26 @@ class DetachableTabWidget(QtWidgets.QTabWidget):
 
         self.setTabBar(self.tabBar)
         self.app = app
-        self.plots = []
+        self.plots = PlotRegistry(self) # All plots, docked or detached, by plotId
+        self.renderEngine = None # Shared engine for off-GUI-thread rendering, see setAsyncRendering
+        self.bufferManager = BufferManager(parent=self) # Releases buffers of hidden plots, see setMemoryBudget
+        self._dockingIcons = None
+        self.instrumentation = None # Draw statistics of all plots, see setInstrumentation
+        self._pendingLinks = {} # plotId of placeholder tabs -> AxisLinks to join once realized
+        self._loads = {} # plotId -> LoadTask of tabs whose data is being loaded, see addtabAsync
+        self._loadPool = None
+        self._overview = None
+
+    def setAsyncRendering(self, enabled=True, maxWorkers=None):
+        """Render all current and future plots in worker threads instead of on the GUI thread"""
+        if enabled and self.renderEngine is None:
+            from RenderEngine import RenderEngine
+            self.renderEngine = RenderEngine(maxWorkers=maxWorkers, parent=self)
+        elif not enabled and self.renderEngine is not None:
+            self.renderEngine.shutdown(wait=False)
+            self.renderEngine = None
+        for plot in self.plots:
+            plot.setRenderEngine(self.renderEngine)
 
     ##
     #  The default movable functionality of QTabWidget must remain disabled
@@ -135,7 +88,7 @@ class DetachableTabWidget(QtWidgets.QTabWidget):
         icon = self.tabIcon(fromIndex)
         text = self.tabText(fromIndex)
 
-        self.removeTab(fromIndex)
+        self.old_removeTab(fromIndex) # Only take the tab out, its plot stays alive
         self.insertTab(toIndex, widget, icon, text)
         self.setCurrentIndex(toIndex)
 
@@ -214,55 +167,489 @@ class DetachableTabWidget(QtWidgets.QTabWidget):
     
     
 
-    def addtab(self,*,tabName=None):
-        """Add matplotlibtab to DetachableTabWidget"""
+    def addtab(self,*,tabName=None,x=None,y=None,decimate=False,scatter=False,source=None,image=None,streaming=False,maxFps=30,lazy=False,setup=None):
+        """Add matplotlibtab to DetachableTabWidget
+
+        Kwargs:
+            - tabName (str): Name of tab. If None, a name is generated (default None)
+            - x (array): x values to plot. If None and y is given, the sample index is used (default None)
+            - y (array): y values to plot. If None, a random plot is created (default None)
+            - decimate (bool): Only render a per-pixel min/max reduction of x and y for the current view (default False)
+            - scatter (bool): Scatter plot x and y, binned into a per-pixel histogram while many points are visible (default False)
+            - source (MemmapSource): Data source to plot instead of x and y, read on demand for the current view (default None)
+            - image (array): Large 2D or 3D (colour) image to show through a multi-resolution pyramid instead of x and y (default None)
+            - streaming (bool): Create an empty canvas to be fed through MplCanvas.addStream/appendData instead of a random plot (default False)
+            - maxFps (int): Maximal number of redraws per second of streamed data (default 30)
+            - lazy (bool): Create a placeholder tab which builds its canvas when first shown. The tab does not take focus (default False)
+            - setup (callable): Called with the new MplCanvas instead of plotting x, y or source, e.g. to restore a session (default None)
+
+        Returns:
+            - Mpltab
+        """
         
         # If no name, generate one
+        if tabName is None and not source is None:
+            tabName = source.name
         if tabName is None:
             count = self.count()
             if count is False:
                 count = 0
             tabName = 'Matplotlib Figure '+str(count)
         
-        # Create the MPL object
-        sc = MplCanvas(self.parent().tabWidget, width=5, height=4, dpi=100)
-        # Create a random plot
-        sc.axes.plot(np.random.rand(10),np.random.rand(10))
-
-        # plotId is simply the next index in self.plots
-        plotId = len(self.plots)
-
-        # Create icons for docking/undocking
-        dockingIcon = QtGui.QIcon()
-        dockingIcon.addPixmap(QtGui.QPixmap(self.app.AppContext.get_resource('icons/dock.png')))
-        
-        unDockingIcon = QtGui.QIcon()
-        unDockingIcon.addPixmap(QtGui.QPixmap(self.app.AppContext.get_resource('icons/undock.png')))
-        
-        # Create Mpltab
-        tab = Mpltab(MplCanvas=sc,plotId=plotId,tabId=self.count(),parent=self, docked=True, mainWindow = self.parent(),\
-            dockingIcon=dockingIcon,unDockingIcon=unDockingIcon)
+        tab = self._createTab(lazy=lazy, x=x, y=y, decimate=decimate, scatter=scatter, source=source, image=image, streaming=streaming, maxFps=maxFps, setup=setup)
         
         # add the tab with temporary name (used in debugging to signify an error)
-        self.addTab(tab, 'Temporary')
-        # Add plot to list of plots
-        self.plots.append(sc)
+        index = self.addTab(tab, 'Temporary')
 
         # Set focus to newly created tab
-        self.setCurrentIndex(tab.tabId)
+        if not lazy:
+            self.setCurrentIndex(index)
         
         # Set name of newly created tab
-        self.setTabText(tab.tabId,tabName)
+        self.setTabText(index,tabName)
+        return tab
 
-    
+    def addtabAsync(self, loader, *, tabName=None, **kwargs):
+        """Add a tab showing a loading indicator while loader runs in a thread pool
+
+        The tab takes focus right away. Once loader returns, its result is
+        plotted as if passed to addtab: a dict of addtab keyword arguments,
+        e.g. {'x':x, 'y':y}, or an array of y values. Closing the tab before
+        then cancels the load, see LoadTask for loaders stopping early.
+
+        Args:
+            - loader (callable): Returns the data to plot, called outside of the GUI thread
+
+        Kwargs:
+            - tabName (str): Name of tab. If None, a name is generated (default None)
+
+        Remaining kwargs are passed on to addtab together with the result of loader.
+
+        Returns:
+            - Mpltab
+        """
+        from Loading import LoadTask
+        if tabName is None:
+            tabName = 'Matplotlib Figure '+str(self.count())
+        tab = self._createTab(lazy=True)
+        tab.setLoading('Loading {}...'.format(tabName))
+        index = self.addTab(tab, tabName)
+        self.setCurrentIndex(index)
+
+        task = LoadTask(loader)
+        task.signals.done.connect(functools.partial(self._on_load_done, tab.plotId, kwargs))
+        task.signals.failed.connect(functools.partial(self._on_load_failed, tab.plotId))
+        self._loads[tab.plotId] = task
+        if self._loadPool is None:
+            self._loadPool = QtCore.QThreadPool(self)
+        self._loadPool.start(task)
+        return tab
+
+    def cancelLoad(self, plotId):
+        """Cancel loading the data of the tab of plotId, False if it is not loading"""
+        task = self._loads.pop(plotId, None)
+        if task is None:
+            return False
+        task.cancel()
+        self._loadPool.tryTake(task) # Not started yet, it will never run
+        return True
+
+    def _on_load_done(self, plotId, kwargs, result):
+        if self._loads.pop(plotId, None) is None: # Cancelled meanwhile
+            return
+        if not isinstance(result, dict):
+            result = {'y':result}
+        kwargs = dict(kwargs, **result)
+        kwargs.pop('lazy', None)
+        self.plots.tab(plotId).finishLoading(functools.partial(self._createCanvas, **kwargs))
+
+    def _on_load_failed(self, plotId, error):
+        if self._loads.pop(plotId, None) is None:
+            return
+        sys.stderr.write(error) # Formatted traceback of the loader, the tab only shows its last line
+        self.plots.tab(plotId).setLoading('Loading failed:\n'+error.strip().splitlines()[-1])
+
+    def addDashboard(self, rows, columns, *, tabName=None, titles=None, maxLength=None, maxFps=30, lazy=False, **kwargs):
+        """Add a tab with a grid of small plots in a single canvas, see Dashboard.Dashboard
+
+        Panels are fed like streams, through tab.canvas.dashboard.append or
+        setData, and only the changed panels are blitted.
+
+        Args:
+            - rows (int): Number of rows of panels
+            - columns (int): Number of columns of panels
+
+        Kwargs:
+            - tabName (str): Name of tab. If None, a name is generated (default None)
+            - titles (list): Title of each panel in row-major order (default None)
+            - maxLength (int): Only keep the newest maxLength samples of each panel. If None, all are kept (default None)
+            - maxFps (int): Maximal number of redraws per second (default 30)
+            - lazy (bool): Create a placeholder tab which builds its canvas when first shown (default False)
+
+        Remaining kwargs are passed on to Dashboard.
+
+        Returns:
+            - Mpltab
+        """
+        from Dashboard import Dashboard
+        setup = functools.partial(Dashboard, rows=rows, columns=columns, titles=titles, maxLength=maxLength, **kwargs)
+        return self.addtab(tabName=tabName, streaming=True, maxFps=maxFps, lazy=lazy, setup=setup)
+
+    def addtabs(self, specs, *, lazy=True, current=-1):
+        """Add many matplotlib tabs in one pass
+
+        Signals of the tab widget and repaints are blocked while the tabs are
+        created, the tab bar is laid out once and the focus is changed once at
+        the end. Docking icons are shared between all tabs.
+
+        Args:
+            - specs (list): One entry per tab, either a dict of addtab keyword arguments or an array of y values
+
+        Kwargs:
+            - lazy (bool): Create placeholder tabs building their canvas when first shown, unless a spec sets lazy (default True)
+            - current (int): Position in specs of the tab to focus afterwards. If None, the focus is not changed (default -1)
+
+        Returns:
+            - list of Mpltab
+        """
+        tabs = []
+        first = self.count()
+        signalsBlocked = self.blockSignals(True)
+        hidden = self.isHidden() # Not isVisible, which is also False while only the window is hidden
+        window = self.window()
+        window.setUpdatesEnabled(False)
+        # While hidden, QTabWidget defers laying out the tab bar instead of
+        # recomputing its size hint, which scans all tabs, on every insert
+        self.setVisible(False)
+        try:
+            for number, spec in enumerate(specs):
+                if not isinstance(spec, dict):
+                    spec = {'y':spec}
+                spec = dict(spec)
+                tabName = spec.pop('tabName', None)
+                if tabName is None:
+                    tabName = 'Matplotlib Figure '+str(first+number)
+                spec.setdefault('lazy', lazy)
+                tab = self._createTab(**spec)
+                self.addTab(tab, tabName)
+                tabs.append(tab)
+        finally:
+            self.setHidden(hidden)
+            window.setUpdatesEnabled(True)
+            self.blockSignals(signalsBlocked)
+        if tabs and not signalsBlocked: # Swallowed for each tab while blocked
+            self.plotsChanged.emit()
+
+        if tabs and not current is None:
+            self.setCurrentIndex(tabs[current].tabId)
+        return tabs
+
+    @property
+    def dockingIcons(self):
+        """Icons for docking and undocking, loaded once and shared by all tabs"""
+        if self._dockingIcons is None:
+            dockingIcon = QtGui.QIcon()
+            dockingIcon.addPixmap(QtGui.QPixmap(self.app.AppContext.get_resource('icons/dock.png')))
+            
+            unDockingIcon = QtGui.QIcon()
+            unDockingIcon.addPixmap(QtGui.QPixmap(self.app.AppContext.get_resource('icons/undock.png')))
+            self._dockingIcons = (dockingIcon, unDockingIcon)
+        return self._dockingIcons
+
+    def _createTab(self, lazy=False, **canvasKwargs):
+        """Create and register a Mpltab, it is not added to the tab widget"""
+        # plotId is a stable ID handed out by the registry
+        plotId = self.plots.newId()
+
+        # Create the MPL object, for lazy tabs only once shown
+        canvasFactory = functools.partial(self._createCanvas, **canvasKwargs)
+        if lazy:
+            sc = None
+        else:
+            sc = canvasFactory()
+
+        dockingIcon, unDockingIcon = self.dockingIcons
+        
+        # Create Mpltab
+        from PlotWidgets import Mpltab
+        tab = Mpltab(MplCanvas=sc,plotId=plotId,parent=self, docked=True, mainWindow = self.parent(),\
+            dockingIcon=dockingIcon,unDockingIcon=unDockingIcon,canvasFactory=canvasFactory)
+        tab.realizedSignal.connect(functools.partial(self._on_tab_realized, plotId))
+
+        # Add plot to registry, placeholders are filled in when realized
+        self.plots.add(plotId, tab, sc)
+        if not sc is None and not self.instrumentation is None:
+            self.instrumentation.attach(plotId, sc)
+        return tab
+
+    def _createCanvas(self,x=None,y=None,decimate=False,scatter=False,source=None,image=None,streaming=False,maxFps=30,setup=None):
+        from PlotWidgets import MplCanvas
+
+        sc = MplCanvas(self.parent().tabWidget, width=5, height=4, dpi=100, maxFps=maxFps)
+        if not self.renderEngine is None:
+            sc.setRenderEngine(self.renderEngine)
+        self.bufferManager.register(sc)
+        if setup is None:
+            self._plotData(sc, x=x, y=y, decimate=decimate, scatter=scatter, source=source, image=image, streaming=streaming)
+        else:
+            setup(sc)
+        return sc
+
+    def _plotData(self,sc,x=None,y=None,decimate=False,scatter=False,source=None,image=None,streaming=False):
+        import numpy as np
+
+        if source is not None:
+            sc.plotSource(source)
+        elif image is not None:
+            sc.plotImage(image)
+        elif y is not None:
+            if scatter:
+                sc.plotDensity(np.arange(len(y)) if x is None else x, y)
+            elif decimate:
+                sc.plotDecimated(x, y)
+            elif x is None:
+                sc.axes.plot(y)
+            else:
+                sc.axes.plot(x, y)
+        elif not streaming:
+            # Create a random plot
+            sc.axes.plot(np.random.rand(10),np.random.rand(10))
+
+    def updatetab(self, plotId, *, x=None, y=None, decimate=False, scatter=False, source=None, image=None):
+        """Replace the data plotted in the tab of plotId, which may be detached
+
+        Args:
+            - plotId (int): ID of the plot
+
+        Kwargs:
+            - x (array): x values to plot. If None and y is given, the sample index is used (default None)
+            - y (array): y values to plot. If None and no source or image is given, the plot is left empty (default None)
+            - decimate (bool): Only render a per-pixel min/max reduction of x and y for the current view (default False)
+            - scatter (bool): Scatter plot x and y, binned while many points are visible (default False)
+            - source (MemmapSource): Data source to plot instead of x and y (default None)
+            - image (array): Large image to show instead of x and y (default None)
+        """
+        tab = self.plots.tab(plotId)
+        streaming = y is None and source is None and image is None
+        if not tab.realized: # Build the placeholder from the new data once shown
+            self.cancelLoad(plotId)
+            tab.finishLoading(functools.partial(self._createCanvas, x=x, y=y, decimate=decimate, scatter=scatter, source=source, image=image, streaming=streaming))
+            return
+        sc = tab.canvas
+        sc.clearAxes()
+        self._plotData(sc, x=x, y=y, decimate=decimate, scatter=scatter, source=source, image=image, streaming=streaming)
+        if image is None: # Images set the limits to their full extent themselves
+            sc.axes.relim()
+            sc.axes.autoscale_view()
+        sc.draw_idle()
+
+    def closePlot(self, plotId):
+        """Close the plot of plotId, whether it is docked or detached"""
+        index = self.plots.tabIndex(plotId)
+        if index >= 0:
+            self.removeTab(index)
+        else:
+            self.plots.tab(plotId).parent().close() # DetachedTab releases the plot when closed
+
+    def _on_tab_realized(self, plotId, canvas):
+        self.plots.setCanvas(plotId, canvas)
+        if not self.instrumentation is None:
+            self.instrumentation.attach(plotId, canvas)
+        for link in self._pendingLinks.pop(plotId, []):
+            link.add(canvas)
+
+    def linkAxes(self, plotIds, axis='x', maxRate=30):
+        """Keep the limits of the plots in sync, docked or detached, see AxisLink
+
+        Placeholder tabs join the link once they are shown.
+
+        Args:
+            - plotIds (list): IDs of the plots to link
+
+        Kwargs:
+            - axis (str): Limits to link, 'x', 'y' or 'xy' (default 'x')
+            - maxRate (float): Maximal number of updates sent per second (default 30)
+
+        Returns:
+            - AxisLink
+        """
+        from AxisLink import AxisLink
+        link = AxisLink(axis=axis, maxRate=maxRate, parent=self)
+        for plotId in plotIds:
+            tab = self.plots.tab(plotId)
+            if tab.realized:
+                link.add(tab.canvas)
+            else:
+                self._pendingLinks.setdefault(plotId, []).append(link)
+        return link
+
+    def exportAll(self, directory, format='png', dpi=None, maxWorkers=None, progress=None, finished=None):
+        """Export every plot, docked or detached, to directory in worker processes, see Export.BatchExporter
+
+        Args:
+            - directory (str): Directory to write the files to, one per plot named by plotId and tab name
+
+        Kwargs:
+            - format (str): File format understood by savefig, e.g. 'png', 'pdf' or 'svg' (default 'png')
+            - dpi (float): Resolution of the files. If None, the resolution of each canvas is used (default None)
+            - maxWorkers (int): Number of worker processes. If None, one per CPU (default None)
+            - progress (callable): Connected to BatchExporter.progress before the export starts (default None)
+            - finished (callable): Connected to BatchExporter.finished before the export starts (default None)
+
+        Returns:
+            - BatchExporter, already started
+        """
+        from Export import BatchExporter, exportFileName
+        jobs = []
+        for entry in self.plots.entries():
+            tab = entry.tab
+            jobs.append((tab, exportFileName(directory, entry.plotId, self.plotName(entry.plotId), format), format, dpi))
+        exporter = BatchExporter(maxWorkers=maxWorkers, parent=self)
+        # Connected first, as an export without plots or with only failing ones finishes within start
+        if not progress is None:
+            exporter.progress.connect(progress)
+        if not finished is None:
+            exporter.finished.connect(finished)
+        exporter.finished.connect(exporter.deleteLater)
+        exporter.start(jobs)
+        return exporter
+
+    def saveSession(self, fileName, compress=False):
+        """Save data, axes state and order of all tabs and the geometry of detached windows, see Session.saveSession
+
+        Args:
+            - fileName (str): Path of the .npz archive
+
+        Kwargs:
+            - compress (bool): Deflate the arrays (default False)
+
+        Returns:
+            - str: Path of the archive
+        """
+        from Session import saveSession
+        return saveSession(self, fileName, compress=compress)
+
+    def restoreSession(self, fileName):
+        """Add the tabs saved in fileName, their data is read when a tab is first shown
+
+        Args:
+            - fileName (str): Path of the .npz archive
+
+        Returns:
+            - list of Mpltab
+        """
+        from Session import restoreSession
+        return restoreSession(self, fileName)
+
+    def setInstrumentation(self, enabled=True, history=60):
+        """Record draw statistics of all plots, see Instrumentation
+
+        Kwargs:
+            - enabled (bool): Start or stop recording (default True)
+            - history (int): Number of recent draws per plot used for mean draw time and FPS (default 60)
+
+        Returns:
+            - Instrumentation, None if disabled
+        """
+        if not self.instrumentation is None:
+            self.instrumentation.detachAll()
+            self.instrumentation.stopLog()
+            self.instrumentation = None
+        if enabled:
+            from Instrumentation import Instrumentation
+            self.instrumentation = Instrumentation(history=history, parent=self)
+            for entry in self.plots.entries():
+                if not entry.canvas is None:
+                    self.instrumentation.attach(entry.plotId, entry.canvas)
+        return self.instrumentation
+
+    def setMemoryBudget(self, budget, idleTime=_unchanged):
+        """Limit the render buffers held by hidden plots
+
+        Args:
+            - budget (int): Bytes of render buffers to keep before least recently used hidden plots are released. None for no limit
+
+        Kwargs:
+            - idleTime (float): Release buffers of plots hidden for longer than this many seconds. None for no limit. If not given, the current idle time is kept (default 60)
+        """
+        self.bufferManager.budget = budget
+        if not idleTime is _unchanged:
+            self.bufferManager.idleTime = idleTime
+        self.bufferManager.enforceBudget()
 
     def removeTab(self,index):
-        # find ID and delete both entry in self.plots as well as figure
+        # find ID and release both entry in self.plots as well as figure
         plotId = self.widget(index).plotId
-        plot = self.plots[plotId]
-        self.plots[plotId] = None
-        del plot
         self.old_removeTab(index)
+        self.cancelLoad(plotId)
+        self._pendingLinks.pop(plotId, None)
+        self.plots.release(plotId)
+
+    def tabInserted(self, index):
+        super().tabInserted(index)
+        self.plotsChanged.emit()
+
+    def tabRemoved(self, index):
+        super().tabRemoved(index)
+        self.plotsChanged.emit()
+
+    def plotIndex(self, plotId):
+        """Tab index of plot with plotId, -1 if it is detached"""
+        return self.plots.tabIndex(plotId)
+
+    def plotIds(self):
+        """IDs of all plots, docked ones in tab order followed by detached ones"""
+        docked = [self.widget(index).plotId for index in range(self.count())]
+        dockedSet = set(docked)
+        return docked+[plotId for plotId in self.plots.ids() if not plotId in dockedSet]
+
+    def plotName(self, plotId):
+        """Tab text of the plot of plotId, or the window title if it is detached"""
+        tab = self.plots.tab(plotId)
+        index = self.indexOf(tab)
+        return self.tabText(index) if index >= 0 else tab.window().windowTitle()
+
+    def showPlot(self, plotId):
+        """Select the tab of the plot of plotId or, if it is detached, restore and raise its window"""
+        tab = self.plots.tab(plotId)
+        if self.indexOf(tab) >= 0:
+            self.setCurrentWidget(tab)
+            window = self.window()
+        else:
+            window = tab.window()
+        if window.isMinimized():
+            window.showNormal()
+        window.raise_()
+        window.activateWindow()
+
+    def showOverview(self, thumbnailSize=None):
+        """Show a scrollable grid of thumbnails of all plots, docked or detached, see Overview.OverviewWindow
+
+        Thumbnails are taken from the frames the plots rendered last, opening
+        the overview does not render any plot.
+
+        Kwargs:
+            - thumbnailSize (QSize): Maximal size of thumbnails. If None, 200x150 pixels. Only used when the overview is first shown (default None)
+
+        Returns:
+            - OverviewWindow
+        """
+        if self._overview is None:
+            from Overview import OverviewWindow
+            self._overview = OverviewWindow(self, thumbnailSize=thumbnailSize, parent=self)
+        self._overview.show()
+        self._overview.raise_()
+        self._overview.activateWindow()
+        return self._overview
+
+    @property
+    def liveFigureCount(self):
+        return self.plots.liveFigureCount
+
+    @property
+    def approxBytes(self):
+        """Approximate bytes held by render buffers and data of all plots"""
+        return self.plots.approxBytes
 
     @pyqtSlot()
     def on_close_tab(self):
@@ -288,6 +675,9 @@ class DetachableTabWidget(QtWidgets.QTabWidget):
             
             self.setWindowFlag(QtCore.Qt.WindowMinimizeButtonHint, True)
             self.setWindowFlag(QtCore.Qt.WindowMaximizeButtonHint, True)
+            # The window is a child of the main window and would otherwise live
+            # on, holding on to its content, after being closed
+            self.setAttribute(QtCore.Qt.WA_DeleteOnClose, True)
             self.docked = False
             self.plotId = self.contentWidget.plotId
             
@@ -305,6 +695,7 @@ class DetachableTabWidget(QtWidgets.QTabWidget):
         def dock(self):
             self.onCloseSignal.emit(self.contentWidget, self.objectName(), self.windowIcon())
             self.docked = True
+            self.contentWidget = None
             self.close()
 
         ##
@@ -330,9 +721,10 @@ class DetachableTabWidget(QtWidgets.QTabWidget):
         #
         #  @param    event    a close event
         def closeEvent(self, event):
-            plot = self.parent().tabWidget.plots[self.plotId]
-            self.parent().tabWidget.plots[self.plotId] = None
-            del plot
+            if not self.docked: # Closing after docking hands the plot back to the tab widget
+                self.parent().tabWidget.cancelLoad(self.plotId)
+                self.parent().tabWidget.plots.release(self.plotId)
+                self.parent().tabWidget.plotsChanged.emit()
             self.close()
             #self.onCloseSignal.emit(self.contentWidget, self.objectName(), self.windowIcon())
         
@@ -345,8 +737,7 @@ class DetachableTabWidget(QtWidgets.QTabWidget):
         #        self.wasOutside = True
 
         def enterParent(self,event):
-            pixmap = QtGui.QScreen.grabWindow(self.app.primaryScreen(), 
-                        self.winId())
+            pixmap = self.contentWidget.dragPixmap()
 
             QtWidgets.QApplication.processEvents()
             self.dock()
@@ -363,14 +754,8 @@ class DetachableTabWidget(QtWidgets.QTabWidget):
             
             tab = self.parent().tabWidget.tabBar.count()-1
 
-            
-            targetPixmap = QtGui.QPixmap(pixmap.size())
-            targetPixmap.fill(QtCore.Qt.transparent)
-            painter = QtGui.QPainter(targetPixmap)
-            painter.setOpacity(0.85)
-            painter.drawPixmap(0, 0, pixmap)
-            painter.end()
-            drag.setPixmap(targetPixmap)
+            if not pixmap is None:
+                drag.setPixmap(pixmap)
 
             # Initiate the drag
             dropAction = drag.exec_(QtCore.Qt.MoveAction | QtCore.Qt.CopyAction)
@@ -474,17 +859,12 @@ class DetachableTabWidget(QtWidgets.QTabWidget):
                 mimeData.setData('action', b'application/tab-detach')
                 drag.setMimeData(mimeData)
 
-                # Create the appearance of dragging the tab content
-
-                pixmap = QtGui.QScreen.grabWindow(self.app.primaryScreen(), 
-                            self.parent().widget(0).winId())
-                targetPixmap = QtGui.QPixmap(pixmap.size())
-                targetPixmap.fill(QtCore.Qt.transparent)
-                painter = QtGui.QPainter(targetPixmap)
-                painter.setOpacity(0.85)
-                painter.drawPixmap(0, 0, pixmap)
-                painter.end()
-                drag.setPixmap(targetPixmap)
+                # Create the appearance of dragging the tab content from a
+                # cached thumbnail of the dragged plot, if the drag started on a tab
+                tab = self.parent().widget(self.tabAt(self.dragStartPos))
+                pixmap = None if tab is None else tab.dragPixmap()
+                if not pixmap is None:
+                    drag.setPixmap(pixmap)
 
                 # Initiate the drag
                 dropAction = drag.exec_(QtCore.Qt.MoveAction | QtCore.Qt.CopyAction)
@@ -522,12 +902,6 @@ class DetachableTabWidget(QtWidgets.QTabWidget):
             QtWidgets.QTabBar.dragMoveEvent(self, event)
 
 
-        def closeEvent(self, event):
-            plot = self.parent().tabWidget.plots[self.plotId]
-            self.parent().tabWidget.plots[self.plotId] = None
-            del plot
-            self.close()
-
         ##
         #  Get the position of the end of the drag
         #
@@ -537,7 +911,24 @@ class DetachableTabWidget(QtWidgets.QTabWidget):
             QtWidgets.QTabBar.dropEvent(self, event)
 
 
-MainBase, MainForm = uic.loadUiType(path.join(path.dirname(__file__),"Main.ui"))
+def loadMainForm():
+    """Return base and form class of the main window
+
+    The form compiled ahead of time by src/build/compile_ui.py is used if it
+    exists and is not older than Main.ui, otherwise Main.ui is parsed.
+    """
+    uiFile = path.join(path.dirname(__file__),"Main.ui")
+    try:
+        import Main_ui
+        if path.exists(uiFile) and path.getmtime(uiFile) > path.getmtime(Main_ui.__file__):
+            raise ImportError('Main_ui is older than Main.ui')
+        return QtWidgets.QMainWindow, Main_ui.Ui_MainWindow
+    except ImportError:
+        from PyQt5 import uic
+        return uic.loadUiType(uiFile)
+
+
+MainBase, MainForm = loadMainForm()
 class MainWindow(MainBase, MainForm):
 
     def __init__(self, app, *args, **kwargs):
@@ -551,9 +942,54 @@ class MainWindow(MainBase, MainForm):
         self.shortcut = QtWidgets.QShortcut(QtGui.QKeySequence("Ctrl+W"), self, self.tabWidget.on_close_tab)
         self.shortcut = QtWidgets.QShortcut(QtGui.QKeySequence("Ctrl+P"), self, self.tabWidget.addtab)
         self.actionPlot_Random.triggered.connect(self.tabWidget.addtab)
+        self.actionSave_Session.triggered.connect(self.saveSession)
+        self.actionOpen_Session.triggered.connect(self.openSession)
+        self.actionExport_All.triggered.connect(self.exportAll)
+        self.actionOverview.triggered.connect(lambda: self.tabWidget.showOverview())
 
         
         self.tabWidget.show()
         self.setCentralWidget(self.tabWidget)
         self.show()
         
+
+    @pyqtSlot()
+    def saveSession(self):
+        fileName, _ = QtWidgets.QFileDialog.getSaveFileName(self, 'Save Session', '', 'Session (*.npz)')
+        if fileName:
+            self.tabWidget.saveSession(fileName)
+
+    @pyqtSlot()
+    def openSession(self):
+        fileName, _ = QtWidgets.QFileDialog.getOpenFileName(self, 'Open Session', '', 'Session (*.npz)')
+        if fileName:
+            self.tabWidget.restoreSession(fileName)
+
+    @pyqtSlot()
+    def exportAll(self):
+        if len(self.tabWidget.plots) == 0:
+            self.statusbar.showMessage('No plots to export', 3000)
+            return
+        directory = QtWidgets.QFileDialog.getExistingDirectory(self, 'Export All Plots')
+        if not directory:
+            return
+        format, ok = QtWidgets.QInputDialog.getItem(self, 'Export All Plots', 'Format', ['png', 'pdf', 'svg'], 0, False)
+        if not ok:
+            return
+
+        # Not modal, the plots can be used while they are exported
+        progress = QtWidgets.QProgressDialog('Exporting plots...', 'Cancel', 0, len(self.tabWidget.plots), self)
+        progress.setWindowModality(QtCore.Qt.NonModal)
+        progress.setAttribute(QtCore.Qt.WA_DeleteOnClose, True)
+        progress.setMinimumDuration(0)
+        exporter = self.tabWidget.exportAll(directory, format=format,
+                                            progress=lambda done, total: progress.setValue(done),
+                                            finished=functools.partial(self._on_export_finished, progress))
+        if exporter.isRunning:
+            progress.canceled.connect(exporter.cancel)
+
+    def _on_export_finished(self, progress, errors):
+        progress.close()
+        if errors:
+            QtWidgets.QMessageBox.warning(self, 'Export All Plots', '{} plot(s) could not be exported:\n\n{}'.format(
+                len(errors), '\n'.join('{}: {}'.format(fileName, error) for fileName, error in errors[:10])))
@@ -0,0 +1,202 @@
+from PyQt5 import QtCore, QtGui, QtWidgets, sip
+
+import functools
+
+
+class OverviewModel(QtCore.QAbstractListModel):
+    """Plots of a DetachableTabWidget, docked or detached, with thumbnails of their last rendered frames
+
+    Thumbnails are only made for rows the view asks for, i.e. visible ones,
+    from the frame each canvas rendered last, see MplCanvas.thumbnail. Plots
+    which were never rendered are listed with a blank thumbnail, nothing is
+    rendered for the overview. When a canvas redraws, its thumbnail is dropped
+    and its row updated, at most every updateInterval seconds.
+
+    Args:
+        - tabWidget (DetachableTabWidget): Tab widget whose plots are listed
+
+    Kwargs:
+        - thumbnailSize (QSize): Maximal size of thumbnails (default 200x150)
+        - updateInterval (float): Seconds between updates of redrawn thumbnails (default 0.25)
+    """
+    PlotIdRole = QtCore.Qt.UserRole
+
+    def __init__(self, tabWidget, thumbnailSize=None, updateInterval=0.25, parent=None):
+        super().__init__(parent)
+        self.tabWidget = tabWidget
+        self.thumbnailSize = QtCore.QSize(200, 150) if thumbnailSize is None else thumbnailSize
+        self._plotIds = []
+        self._rows = {} # plotId -> row
+        self._pixmaps = {} # plotId -> QPixmap of the last rendered frame
+        self._watched = {} # plotId -> (object, signal, slot) connected to follow redraws
+        self._dirty = set()
+
+        self._blank = QtGui.QPixmap(self.thumbnailSize)
+        self._blank.fill(QtGui.QColor(230, 230, 230))
+
+        self._updateTimer = QtCore.QTimer(self)
+        self._updateTimer.setSingleShot(True)
+        self._updateTimer.setInterval(int(updateInterval*1000))
+        self._updateTimer.timeout.connect(self._updateDirty)
+        # Tabs are often added, moved or detached in bulk, list them once afterwards
+        self._refreshTimer = QtCore.QTimer(self)
+        self._refreshTimer.setSingleShot(True)
+        self._refreshTimer.setInterval(0)
+        self._refreshTimer.timeout.connect(self.refresh)
+        tabWidget.plotsChanged.connect(self._refreshTimer.start)
+        self.refresh()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._plotIds)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._plotIds):
+            return None
+        plotId = self._plotIds[index.row()]
+        if not plotId in self.tabWidget.plots:
+            return None
+        if role == QtCore.Qt.DisplayRole:
+            return self.tabWidget.plotName(plotId)
+        if role == QtCore.Qt.ToolTipRole:
+            docked = self.tabWidget.plots.tabIndex(plotId) >= 0
+            return self.tabWidget.plotName(plotId)+('' if docked else ' (detached)')
+        if role == QtCore.Qt.DecorationRole:
+            return self._thumbnail(plotId)
+        if role == self.PlotIdRole:
+            return plotId
+        return None
+
+    def refresh(self):
+        """List the current plots again, thumbnails of plots still listed are kept"""
+        self._refreshTimer.stop()
+        self.beginResetModel()
+        self._plotIds = self.tabWidget.plotIds()
+        self._rows = {plotId:row for row, plotId in enumerate(self._plotIds)}
+        for plotId in list(self._watched):
+            if not plotId in self._rows:
+                self._unwatch(plotId)
+                self._pixmaps.pop(plotId, None)
+        for plotId in self._plotIds:
+            self._watch(plotId)
+        self._dirty &= set(self._plotIds)
+        self.endResetModel()
+
+    def clear(self):
+        """Stop following the plots and drop all thumbnails"""
+        self._updateTimer.stop()
+        self._refreshTimer.stop()
+        try:
+            self.tabWidget.plotsChanged.disconnect(self._refreshTimer.start)
+        except TypeError: # Already disconnected
+            pass
+        self.beginResetModel()
+        for plotId in list(self._watched):
+            self._unwatch(plotId)
+        self._plotIds = []
+        self._rows = {}
+        self._pixmaps = {}
+        self._dirty = set()
+        self.endResetModel()
+
+    def _thumbnail(self, plotId):
+        pixmap = self._pixmaps.get(plotId)
+        if not pixmap is None:
+            return pixmap
+        tab = self.tabWidget.plots.tab(plotId)
+        if not tab.realized:
+            return self._blank
+        image = tab.canvas.thumbnail(self.thumbnailSize)
+        if image is None: # Never rendered
+            return self._blank
+        pixmap = QtGui.QPixmap.fromImage(image)
+        self._pixmaps[plotId] = pixmap
+        return pixmap
+
+    def _watch(self, plotId):
+        tab = self.tabWidget.plots.tab(plotId)
+        if tab.realized:
+            target, signal = tab.canvas, tab.canvas.frameChanged
+        else: # Follow the canvas once the placeholder builds it
+            target, signal = tab, tab.realizedSignal
+        if plotId in self._watched:
+            if self._watched[plotId][0] is target:
+                return
+            self._unwatch(plotId)
+        slot = functools.partial(self._on_changed, plotId)
+        signal.connect(slot)
+        self._watched[plotId] = (target, signal, slot)
+
+    def _unwatch(self, plotId):
+        target, signal, slot = self._watched.pop(plotId)
+        if not sip.isdeleted(target):
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                pass
+
+    def _on_changed(self, plotId, *args):
+        self._dirty.add(plotId)
+        if not self._updateTimer.isActive():
+            self._updateTimer.start()
+
+    def _updateDirty(self):
+        dirty, self._dirty = self._dirty, set()
+        for plotId in dirty:
+            row = self._rows.get(plotId)
+            if row is None or not plotId in self.tabWidget.plots:
+                continue
+            self._pixmaps.pop(plotId, None)
+            self._watch(plotId) # A placeholder may have built its canvas
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [QtCore.Qt.DecorationRole])
+
+
+class OverviewWindow(QtWidgets.QWidget):
+    """Scrollable grid of thumbnails of all plots, a plot is shown by activating its thumbnail
+
+    Plots can be filtered by name. Activating a thumbnail, e.g. by a double
+    click, selects the tab of the plot or raises its detached window and hides
+    the overview.
+
+    Args:
+        - tabWidget (DetachableTabWidget): Tab widget whose plots are shown
+    """
+    def __init__(self, tabWidget, thumbnailSize=None, parent=None):
+        super().__init__(parent, QtCore.Qt.Window)
+        self.tabWidget = tabWidget
+        self.setWindowTitle('Overview')
+        self.model = OverviewModel(tabWidget, thumbnailSize=thumbnailSize, parent=self)
+        self.proxy = QtCore.QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+
+        self.filterEdit = QtWidgets.QLineEdit(self)
+        self.filterEdit.setPlaceholderText('Filter by name')
+        self.filterEdit.setClearButtonEnabled(True)
+        self.filterEdit.textChanged.connect(self.proxy.setFilterFixedString)
+
+        size = self.model.thumbnailSize
+        self.view = QtWidgets.QListView(self)
+        self.view.setViewMode(QtWidgets.QListView.IconMode)
+        self.view.setMovement(QtWidgets.QListView.Static)
+        self.view.setResizeMode(QtWidgets.QListView.Adjust)
+        self.view.setUniformItemSizes(True)
+        self.view.setIconSize(size)
+        self.view.setGridSize(QtCore.QSize(size.width()+16, size.height()+40))
+        self.view.setTextElideMode(QtCore.Qt.ElideRight)
+        self.view.setModel(self.proxy)
+        self.view.activated.connect(self._on_activated)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.filterEdit)
+        layout.addWidget(self.view)
+        self.resize(4*(size.width()+16)+40, 3*(size.height()+40)+70)
+
+        QtWidgets.QShortcut(QtGui.QKeySequence('Escape'), self, self.hide)
+
+    def _on_activated(self, index):
+        plotId = index.data(OverviewModel.PlotIdRole)
+        if plotId is None:
+            return
+        self.hide()
+        self.tabWidget.showPlot(plotId)
@@ -0,0 +1,106 @@
+from PyQt5 import sip
+
+import itertools
+
+
+class PlotEntry(object):
+    """Book keeping of a single plot in a PlotRegistry"""
+    __slots__ = ('plotId', 'tab', 'canvas')
+
+    def __init__(self, plotId, tab, canvas=None):
+        self.plotId = plotId
+        self.tab = tab
+        self.canvas = canvas # None while the tab is a placeholder
+
+    def __repr__(self):
+        return 'PlotEntry(plotId={}, canvas={})'.format(self.plotId, self.canvas)
+
+
+class PlotRegistry(object):
+    """Registry of plots keyed by stable plot IDs.
+
+    IDs are never reused, such that an ID held by a DetachedTab or a client
+    stays valid (or becomes unknown) regardless of tabs being moved, removed
+    or detached. Lookup and removal are dictionary operations, the tab index
+    of a plot is found from its tab widget without scanning the registry.
+    """
+    def __init__(self, tabWidget=None):
+        self.tabWidget = tabWidget
+        self._entries = {}
+        self._ids = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, plotId):
+        return plotId in self._entries
+
+    def __iter__(self):
+        """Iterate over realized canvases"""
+        return iter([entry.canvas for entry in self._entries.values() if not entry.canvas is None])
+
+    def __getitem__(self, plotId):
+        return self._entries[plotId].canvas
+
+    def newId(self):
+        return next(self._ids)
+
+    def add(self, plotId, tab, canvas=None):
+        if plotId in self._entries:
+            raise AttributeError('Plot ID {} is already registered'.format(plotId))
+        self._entries[plotId] = PlotEntry(plotId, tab, canvas)
+        return plotId
+
+    def entry(self, plotId):
+        return self._entries[plotId]
+
+    def entries(self):
+        return list(self._entries.values())
+
+    def ids(self):
+        return list(self._entries.keys())
+
+    def tab(self, plotId):
+        return self._entries[plotId].tab
+
+    def setCanvas(self, plotId, canvas):
+        if plotId in self._entries:
+            self._entries[plotId].canvas = canvas
+
+    def tabIndex(self, plotId):
+        """Index of the plot in the tab widget, -1 if it is detached"""
+        if self.tabWidget is None:
+            return -1
+        return self.tabWidget.indexOf(self._entries[plotId].tab)
+
+    def release(self, plotId):
+        """Remove plot from the registry and free its canvas, figure, toolbar and tab"""
+        entry = self._entries.pop(plotId, None)
+        if entry is None:
+            return False
+
+        if not entry.canvas is None and not sip.isdeleted(entry.canvas):
+            entry.canvas.release()
+        tab = entry.tab
+        if not tab is None and not sip.isdeleted(tab):
+            if not tab.menubar is None and not sip.isdeleted(tab.menubar):
+                tab.menubar.deleteLater()
+            tab.deleteLater()
+        entry.canvas = None
+        entry.tab = None
+        return True
+
+    def releaseAll(self):
+        for plotId in self.ids():
+            self.release(plotId)
+
+    @property
+    def liveFigureCount(self):
+        """Number of realized figures held by the registry"""
+        return sum(1 for entry in self._entries.values() if not entry.canvas is None)
+
+    @property
+    def approxBytes(self):
+        """Approximate bytes held by render buffers and plotted data of all registered plots"""
+        return sum(entry.canvas.bufferBytes+entry.canvas.dataBytes for entry in self._entries.values()
+                   if not entry.canvas is None and not sip.isdeleted(entry.canvas))
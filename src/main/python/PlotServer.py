@@ -0,0 +1,300 @@
+from PyQt5 import QtCore, QtNetwork
+from PyQt5.QtCore import pyqtSlot
+
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from os import environ
+import json
+import os
+import sys
+import traceback
+
+
+# Messages are single lines of UTF-8 encoded JSON, every message is answered
+# by one line {"ok": true} or {"ok": false, "error": "..."}. Arrays are not
+# part of the message but passed as the names of shared memory segments:
+#
+#   {"command": "plot", "tabName": "Signal", "decimate": true,
+#    "arrays": {"y": {"name": "psm_1234", "dtype": "<f8", "shape": [1000000]}}}
+#   {"command": "close", "tabName": "Signal"}
+
+environmentVariable = 'GUIMATPLOTLIB_SERVER'
+defaultName = 'GuiMatplotlib'
+
+
+def serverName(name=None):
+    """Name of the local socket, taken from GUIMATPLOTLIB_SERVER if not given"""
+    if name is None:
+        name = environ.get(environmentVariable, defaultName)
+    return name
+
+
+def openSegment(name):
+    """Attach to an existing shared memory segment without taking ownership of it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError: # Python < 3.13 always registers the segment, the resource tracker would unlink it at exit
+        segment = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(segment._name, 'shared_memory')
+        return segment
+
+
+class PlotServer(QtCore.QObject):
+    """Local socket through which other processes create, update and close tabs by name
+
+    Arrays are mapped from shared memory created by the client, see
+    PlotClient, and plotted without copying. The segments stay mapped as long
+    as the tab shows them. Messages are applied on a single shot timer, if a
+    tab is updated several times before the timer fires, only the latest
+    update is plotted.
+
+    Args:
+        - tabWidget (DetachableTabWidget): Tab widget to plot into
+
+    Kwargs:
+        - name (str): Name of the local socket. If None, GUIMATPLOTLIB_SERVER or 'GuiMatplotlib' is used (default None)
+        - mergeInterval (float): Seconds to collect updates before they are applied (default 0.03)
+    """
+    def __init__(self, tabWidget, name=None, mergeInterval=0.03, parent=None):
+        super().__init__(parent)
+        self.tabWidget = tabWidget
+        self.name = serverName(name)
+
+        self._server = QtNetwork.QLocalServer(self)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._received = {} # socket -> bytes received after the last complete message
+
+        self._tabs = {} # tabName -> plotId
+        self._segments = {} # tabName -> segments plotted in the tab
+        self._pending = OrderedDict() # tabName -> (command, kwargs, segments)
+        self._unreleased = [] # segments still referenced by an array when released
+
+        self._mergeTimer = QtCore.QTimer(self)
+        self._mergeTimer.setSingleShot(True)
+        self._mergeTimer.setInterval(int(mergeInterval*1000))
+        self._mergeTimer.timeout.connect(self.applyPending)
+
+    @property
+    def isListening(self):
+        return self._server.isListening()
+
+    def listen(self):
+        """Start listening, returns False if another instance already serves the name"""
+        if self._server.listen(self.name):
+            return True
+        # Remove the socket file left behind by a crashed instance, but leave a running one alone
+        probe = QtNetwork.QLocalSocket()
+        probe.connectToServer(self.name)
+        if probe.waitForConnected(100):
+            probe.abort()
+            return False
+        QtNetwork.QLocalServer.removeServer(self.name)
+        return self._server.listen(self.name)
+
+    def close(self):
+        self._server.close()
+        self._mergeTimer.stop()
+        for command, kwargs, segments in self._pending.values():
+            self._releaseSegments(segments)
+        self._pending.clear()
+
+    @pyqtSlot()
+    def _on_new_connection(self):
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            self._received[socket] = b''
+            socket.readyRead.connect(lambda socket=socket: self._on_ready_read(socket))
+            socket.disconnected.connect(lambda socket=socket: self._on_disconnected(socket))
+
+    def _on_disconnected(self, socket):
+        self._received.pop(socket, None)
+        socket.deleteLater()
+
+    def _on_ready_read(self, socket):
+        data = self._received.get(socket, b'')+bytes(socket.readAll())
+        *messages, self._received[socket] = data.split(b'\n')
+        for message in messages:
+            if not message.strip():
+                continue
+            try:
+                self.handleMessage(json.loads(message.decode('utf-8')))
+                reply = {'ok':True}
+            except Exception as e:
+                reply = {'ok':False, 'error':'{}: {}'.format(type(e).__name__, e)}
+            socket.write(json.dumps(reply).encode('utf-8')+b'\n')
+        socket.flush()
+
+    def handleMessage(self, message):
+        """Queue the command of a decoded message, raises on invalid messages"""
+        command = message.get('command')
+        tabName = message.get('tabName')
+        if not isinstance(tabName, str):
+            raise AttributeError('Message needs a tabName, got {}'.format(tabName))
+
+        if command == 'plot':
+            segments = []
+            kwargs = {'decimate':bool(message.get('decimate', False))}
+            try:
+                for key, spec in message.get('arrays', {}).items():
+                    if not key in ['x', 'y']:
+                        raise AttributeError('Unknown array {}, expected x or y'.format(key))
+                    segment = openSegment(spec['name'])
+                    segments.append(segment)
+                    kwargs[key] = self._array(segment, spec)
+                    if kwargs[key].ndim != 1:
+                        raise AttributeError('Array {} of {} has to be 1D, got shape {}'.format(key, tabName, kwargs[key].shape))
+                if not 'y' in kwargs:
+                    raise AttributeError('Plot message for {} has no y array'.format(tabName))
+                if 'x' in kwargs and len(kwargs['x']) != len(kwargs['y']):
+                    raise AttributeError('Length of x ({}) does not match length of y ({}) of {}'.format(
+                        len(kwargs['x']), len(kwargs['y']), tabName))
+            except Exception:
+                kwargs = {} # Views of the segments, which could not be closed otherwise
+                self._releaseSegments(segments)
+                raise
+        elif command == 'close':
+            segments = []
+            kwargs = {}
+        else:
+            raise AttributeError('Unknown command {}'.format(command))
+
+        # Merge with an update of the same tab which has not been applied yet
+        previous = self._pending.pop(tabName, None)
+        if not previous is None:
+            self._releaseSegments(previous[2])
+        self._pending[tabName] = (command, kwargs, segments)
+        if not self._mergeTimer.isActive():
+            self._mergeTimer.start()
+
+    @staticmethod
+    def _array(segment, spec):
+        import numpy as np
+        dtype = np.dtype(spec['dtype'])
+        shape = tuple(spec['shape'])
+        if dtype.itemsize*int(np.prod(shape)) > segment.size:
+            raise AttributeError('Shape {} of {} exceeds shared memory {}'.format(shape, dtype, segment.name))
+        array = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        array.flags.writeable = False
+        return array
+
+    @pyqtSlot()
+    def applyPending(self):
+        """Apply all queued commands to the tab widget"""
+        self._dropClosed()
+        pending, self._pending = self._pending, OrderedDict()
+        for tabName in list(pending):
+            command, kwargs, segments = pending.pop(tabName)
+            plotId = self._tabs.get(tabName)
+            try:
+                if command == 'plot':
+                    if plotId is None:
+                        tab = self.tabWidget.addtab(tabName=tabName, **kwargs)
+                        self._tabs[tabName] = tab.plotId
+                    else:
+                        self.tabWidget.updatetab(plotId, **kwargs)
+                    self._releaseSegments(self._segments.pop(tabName, []))
+                    self._segments[tabName] = segments
+                elif not plotId is None:
+                    self.tabWidget.closePlot(plotId)
+            except Exception:
+                # Reported and skipped, the remaining updates are still applied
+                print('Could not apply {} of {}:'.format(command, tabName), file=sys.stderr)
+                traceback.print_exc()
+                del kwargs
+                self._releaseSegments(segments)
+        self._dropClosed()
+
+    def _dropClosed(self):
+        """Forget tabs closed in the GUI and release their shared memory"""
+        for tabName, plotId in list(self._tabs.items()):
+            if not plotId in self.tabWidget.plots:
+                del self._tabs[tabName]
+                self._releaseSegments(self._segments.pop(tabName, []))
+        self._releaseSegments([])
+
+    def _releaseSegments(self, segments):
+        # Arrays of a closed plot may only be collected later, retry those segments on the next call
+        remaining = []
+        for segment in self._unreleased+list(segments):
+            try:
+                segment.close()
+            except BufferError:
+                remaining.append(segment)
+        self._unreleased = remaining
+
+
+class PlotClient(object):
+    """Client of a PlotServer, for use from other processes
+
+    Arrays are copied once into new shared memory segments, which are unlinked
+    as soon as the server has mapped them. The memory is freed when the server
+    no longer plots it.
+
+    Kwargs:
+        - name (str): Name of the local socket. If None, GUIMATPLOTLIB_SERVER or 'GuiMatplotlib' is used (default None)
+        - timeout (float): Seconds to wait for the server (default 5)
+    """
+    def __init__(self, name=None, timeout=5.0):
+        self.name = serverName(name)
+        self.timeout = int(timeout*1000)
+        self._socket = QtNetwork.QLocalSocket()
+        self._socket.connectToServer(self.name)
+        if not self._socket.waitForConnected(self.timeout):
+            raise ConnectionError('No plot server at {}: {}'.format(self.name, self._socket.errorString()))
+        self._received = b''
+
+    def plot(self, tabName, y, x=None, decimate=True):
+        """Create or update the tab tabName to plot y against x
+
+        Args:
+            - tabName (str): Name of the tab
+            - y (array): y values
+
+        Kwargs:
+            - x (array): x values. If None, the sample index is used (default None)
+            - decimate (bool): Only render a per-pixel min/max reduction of the current view (default True)
+        """
+        import numpy as np
+        segments = []
+        try:
+            arrays = {}
+            for key, values in [('y', y), ('x', x)]:
+                if values is None:
+                    continue
+                values = np.ascontiguousarray(values)
+                segment = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                segments.append(segment)
+                np.ndarray(values.shape, dtype=values.dtype, buffer=segment.buf)[...] = values
+                arrays[key] = {'name':segment.name, 'dtype':values.dtype.str, 'shape':list(values.shape)}
+            self._send({'command':'plot', 'tabName':tabName, 'decimate':decimate, 'arrays':arrays})
+        finally:
+            # The server holds its own mapping once it has replied
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+    def closeTab(self, tabName):
+        self._send({'command':'close', 'tabName':tabName})
+
+    def close(self):
+        self._socket.disconnectFromServer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _send(self, message):
+        self._socket.write(json.dumps(message).encode('utf-8')+b'\n')
+        self._socket.flush()
+        while not b'\n' in self._received:
+            if not self._socket.waitForReadyRead(self.timeout):
+                raise ConnectionError('No reply from plot server at {}: {}'.format(self.name, self._socket.errorString()))
+            self._received += bytes(self._socket.readAll())
+        reply, self._received = self._received.split(b'\n', 1)
+        reply = json.loads(reply.decode('utf-8'))
+        if not reply.get('ok'):
+            raise RuntimeError(reply.get('error'))
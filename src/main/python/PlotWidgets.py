@@ -0,0 +1,845 @@
+from PyQt5 import QtGui, QtCore, QtWidgets, sip
+from PyQt5.QtCore import pyqtSignal
+
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg,NavigationToolbar2QT as NavigationToolbar
+from matplotlib.figure import Figure
+import numpy as np
+
+import time
+import weakref
+import zlib
+
+from Streaming import StreamingLine
+from Decimation import DecimatedLine
+from ImagePyramid import PyramidImage
+from DensityScatter import DensityScatter
+
+
+class Mpltab(QtWidgets.QWidget):
+    """ Widget to keep track of mpl figure in tab
+
+    If no MplCanvas but a canvasFactory is given, the tab is a lightweight
+    placeholder and the canvas and toolbar are only built when the tab is first
+    shown or its canvas is accessed."""
+    realizedSignal = pyqtSignal(object)
+
+    def __init__(self,MplCanvas, plotId, tabId=None, mainWindow=None, parent=None, toolbar=True, docked=True, dockingIcon=None, unDockingIcon=None, canvasFactory=None):
+        super().__init__(parent=parent)
+
+        # Save plotId and the tab widget the tab belongs to. The tab index is
+        # looked up from the tab widget as it changes when tabs are moved or
+        # removed, tabId is only kept for backwards compatibility
+        self._canvas = MplCanvas
+        self.canvasFactory = canvasFactory
+        self.plotId = plotId
+        self.tabWidget = parent
+
+        # If docked, as standard the Mpltab is created as docked in a DetachableTabWidget
+        self.docked=docked
+        self.mainWindow = mainWindow
+
+        self.layout = QtWidgets.QVBoxLayout()
+        self.layout.setContentsMargins(0,0,0,0) # Remove border around layout
+
+        self.dockingIcon = dockingIcon
+        self.unDockingIcon = unDockingIcon
+        self.toolbar = toolbar
+        self.menubar = None
+        self.dockAction = None
+        self._loadingLabel = None
+
+        if not self._canvas is None:
+            self._buildContent()
+        
+        if not self.docked: # start undocked
+            self.undock(parent=self.parent)
+
+        self.setLayout(self.layout)
+
+    @property
+    def tabId(self):
+        """Current index of the tab in its DetachableTabWidget, -1 if detached"""
+        if self.tabWidget is None:
+            return -1
+        return self.tabWidget.indexOf(self)
+
+    @property
+    def realized(self):
+        return not self._canvas is None
+
+    @property
+    def canvas(self):
+        """The MplCanvas of the tab, built if the tab is still a placeholder"""
+        self.realize()
+        return self._canvas
+
+    @property
+    def loading(self):
+        """True while the data of the tab is being loaded, see setLoading"""
+        return not self._loadingLabel is None
+
+    def setLoading(self, text='Loading...'):
+        """Show text instead of a plot and do not realize the tab until finishLoading is called"""
+        if self._loadingLabel is None:
+            self._loadingLabel = QtWidgets.QLabel(self)
+            self._loadingLabel.setAlignment(QtCore.Qt.AlignCenter)
+            self.layout.addWidget(self._loadingLabel)
+        self._loadingLabel.setText(text)
+
+    def finishLoading(self, canvasFactory):
+        """Replace the loading indicator by the plot built by canvasFactory, right away if the tab is shown"""
+        if not self._loadingLabel is None:
+            self.layout.removeWidget(self._loadingLabel)
+            self._loadingLabel.deleteLater()
+            self._loadingLabel = None
+        self.canvasFactory = canvasFactory
+        if self.isVisible():
+            self.realize()
+
+    def realize(self):
+        """Build canvas and toolbar of a placeholder tab"""
+        if self.realized or self.loading:
+            return
+        self._canvas = self.canvasFactory()
+        self._buildContent()
+        self.realizedSignal.emit(self._canvas)
+
+    def showEvent(self, event):
+        self.realize()
+        super().showEvent(event)
+
+    def dragPixmap(self, opacity=0.85):
+        """Semi transparent preview of the plot for dragging, None if the tab has not been rendered"""
+        if not self.realized:
+            return None
+        image = self._canvas.thumbnail(opacity=opacity)
+        if image is None:
+            return None
+        return QtGui.QPixmap.fromImage(image)
+
+    def _buildContent(self):
+        if self.toolbar: # If a toolbar is wanted, create it, otherwise create menubar above figure
+            self.menubar = NavigationToolbar(self._canvas, None)
+        else:
+            self.menubar = QtWidgets.QMenuBar(self)
+            self.menubar.setFixedHeight(25)
+
+        # ad menubar and canvas to layout
+        self.layout.addWidget(self.menubar)
+        self.layout.addWidget(self._canvas)
+        self.dockAction = QtWidgets.QAction('Undock',self.menubar)
+        self._updateDockAction()
+
+        # Add shortcut to dock
+        self.dockAction.setShortcut("Ctrl+D")
+        self.menubar.addAction(self.dockAction)
+        self.dockAction.triggered.connect(self.toggleDocked)
+
+        # Overlay of draw statistics of the canvas
+        self.statsAction = QtWidgets.QAction('Stats',self.menubar)
+        self.statsAction.setCheckable(True)
+        self.statsAction.setChecked(self._canvas.showStats)
+        self.statsAction.setToolTip('Show draw time, redraw counts, FPS, buffer size and artist count')
+        self.menubar.addAction(self.statsAction)
+        self.statsAction.toggled.connect(self._canvas.setShowStats)
+
+    def _updateDockAction(self):
+        if self.dockAction is None: # Not realized yet
+            return
+        self.dockAction.setText('Dock' if not self.docked else 'Undock')
+        if not self.dockingIcon is None and not self.unDockingIcon is None:
+            self.dockAction.setIcon(self.dockingIcon if not self.docked else self.unDockingIcon)
+
+    def toggleDocked(self):
+        if self.docked:
+            self.tabWidget.detachTab(index=self.tabId,point=QtGui.QCursor().pos())
+        else:
+            parent = self.parent()
+            parent.dock()#attachTab(parent.contentWidget, parent.objectName(), parent.windowIcon())
+            
+
+
+    def undock(self,newParent):
+        self.docked = False
+        self._updateDockAction()
+        self.setParent(newParent)
+        
+
+    def dock(self,newParent):
+        self.docked = True
+        self._updateDockAction()
+        self.setParent(newParent)
+
+
+class MplCanvas(FigureCanvasQTAgg):
+    """Simple Matplotlib class"""
+    frameChanged = pyqtSignal() # A new frame was rendered or blitted, cached thumbnails are outdated
+    thumbnailSize = QtCore.QSize(400, 300) # Default maximal size of thumbnails, e.g. drag previews
+    resizeDelay = 0.15 # Seconds without resize events before re-rendering at the new size, None to render on every resize
+
+    def __init__(self, parent=None, width=5, height=4, dpi=100, maxFps=30):
+        self.fig = Figure(figsize=(width, height), dpi=dpi)
+        self.axes = self.fig.add_subplot(111)
+        super(MplCanvas, self).__init__(self.fig)
+
+        # Lines rendered through a viewport-dependent reduction
+        self.decimatedLines = []
+        # Large images rendered from a multi-resolution pyramid
+        self.pyramidImages = []
+        # Scatter plots binned into a histogram while many points are visible
+        self.densityScatters = []
+
+        # Streaming lines, their per-axes backgrounds and the timer merging updates
+        self.streams = []
+        self.dashboard = None # Grid of panels laid out by Dashboard, if any
+        self.maxFps = maxFps
+        self.streamHeadroom = 0.25 # Fraction of x range added when rescaling to fit streams
+        self._backgrounds = {}
+        self._lastStreamDraw = 0.0
+        self._streamTimer = QtCore.QTimer(self)
+        self._streamTimer.setSingleShot(True)
+        self._streamTimer.timeout.connect(self.flushStreams)
+        self.mpl_connect('draw_event', self._on_draw)
+        self.mpl_connect('resize_event', self._on_resize)
+
+        # Optional off-GUI-thread rendering, see setRenderEngine
+        self.renderEngine = None
+        self._frame = None
+        self._frameGeneration = 0
+
+        # Render buffer release while hidden, see BufferManager
+        self.bufferManager = None
+        self.snapshot = None # (width, height, zlib compressed RGBA) of the last released buffer
+        self._bufferReleased = False
+
+        # Downscaled copies of the render buffer by (width, height, opacity), cleared on redraw
+        self._thumbnails = {}
+
+        # While resizing, the last rendered frame is scaled until resize events stop
+        self._resizePreview = None
+        self._resizeStartSize = None
+        self._resizeTimer = QtCore.QTimer(self)
+        self._resizeTimer.setSingleShot(True)
+        self._resizeTimer.timeout.connect(self.finishResize)
+
+        # Opt-in draw statistics, see Instrumentation, and their overlay
+        self.stats = None
+        self.showStats = False
+        self._submitTime = None
+        self._statsRect = QtCore.QRect()
+
+        # Redraws, stream updates and animation timers wait while the canvas is not shown, see isShown
+        self._deferredDraw = True # Nothing rendered yet
+        self._animationTimers = weakref.WeakSet()
+        self._pausedTimers = []
+        self._watchedWindow = None
+        self._watchedHandle = None
+        self._shown = False
+        self._resumeTimer = QtCore.QTimer(self)
+        self._resumeTimer.setSingleShot(True)
+        self._resumeTimer.setInterval(0)
+        self._resumeTimer.timeout.connect(self._resume)
+        self.renderCount = 0 # Number of full renders, see draw
+
+    def setRenderEngine(self, renderEngine):
+        """Render the figure through renderEngine instead of on the GUI thread
+
+        While a render is pending, the last finished frame is shown. Pass None
+        to return to synchronous Agg rendering.
+        """
+        if self.renderEngine is not None:
+            self.renderEngine.forget(self)
+        self.renderEngine = renderEngine
+        self._frame = None
+        self._frameGeneration = 0
+        self._backgrounds = {}
+        self.draw_idle()
+
+    @property
+    def isShown(self):
+        """False while the canvas is hidden, e.g. in a background tab, or its window is minimized or not exposed
+
+        Whether a window covered by other windows counts as not exposed depends on the platform.
+        """
+        if not self.isVisible():
+            return False
+        window = self.window()
+        if window.isMinimized():
+            return False
+        handle = window.windowHandle()
+        return handle is None or handle.isExposed()
+
+    def draw_idle(self):
+        if not self.isShown:
+            self._deferredDraw = True # Drawn once when shown again
+            return
+        super().draw_idle()
+
+    def new_timer(self, *args, **kwargs):
+        """Backend timer, e.g. of an animation, which is paused while the canvas is not shown"""
+        timer = super().new_timer(*args, **kwargs)
+        self._animationTimers.add(timer)
+        return timer
+
+    def _updateShown(self):
+        """Pause timers when no longer shown, resume them and apply everything deferred when shown again"""
+        shown = self.isShown
+        if shown == self._shown:
+            return
+        self._shown = shown
+        if not shown:
+            self._resumeTimer.stop()
+            self._streamTimer.stop()
+            for timer in self._animationTimers:
+                if not sip.isdeleted(timer._timer) and timer._timer.isActive(): # The QTimer of the backend timer
+                    timer.stop()
+                    self._pausedTimers.append(timer)
+            return
+        for timer in self._pausedTimers:
+            if not sip.isdeleted(timer._timer):
+                timer.start()
+        self._pausedTimers = []
+        # Let layouts settle first, e.g. right after docking the canvas is briefly given another size
+        self._resumeTimer.start()
+
+    def _resume(self):
+        """Apply the final size, queued samples and draws requested while not shown in a single render"""
+        if not self.isShown:
+            return
+        if self._resizePreview is None and not self._figureMatches(self.size()):
+            super().resizeEvent(QtGui.QResizeEvent(self.size(), self.size()))
+        if any(stream.pending for stream in self.streams):
+            self.flushStreams() # Draws in full if a draw is due anyway
+        if self._deferredDraw:
+            self._deferredDraw = False
+            super().draw_idle()
+
+    def _watchWindow(self):
+        """Follow minimizing and exposure of the window the canvas is in, which changes when it is detached
+
+        Only shown canvases watch their window, see _unwatchWindow, as the
+        filter is called for every event the window receives.
+        """
+        window = self.window()
+        handle = window.windowHandle()
+        if window is self._watchedWindow and handle is self._watchedHandle:
+            return
+        self._unwatchWindow()
+        window.installEventFilter(self)
+        if not handle is None:
+            handle.installEventFilter(self)
+        self._watchedWindow = window
+        self._watchedHandle = handle
+
+    def _unwatchWindow(self):
+        for watched in [self._watchedWindow, self._watchedHandle]:
+            if not watched is None and not sip.isdeleted(watched):
+                watched.removeEventFilter(self)
+        self._watchedWindow = None
+        self._watchedHandle = None
+
+    def eventFilter(self, obj, event):
+        if event.type() in [QtCore.QEvent.WindowStateChange, QtCore.QEvent.Expose]:
+            self._updateShown()
+        return False
+
+    def draw(self):
+        self.renderCount += 1
+        self._deferredDraw = False
+        self._draw_pending = False # Satisfies an idle draw queued by the Qt backend as well
+        if self.renderEngine is not None:
+            if not self.stats is None:
+                self._submitTime = time.perf_counter()
+            self.renderEngine.submit(self)
+            return
+        if self.stats is None:
+            super().draw()
+            return
+        start = time.perf_counter()
+        super().draw()
+        self._recordDraw('full', time.perf_counter()-start)
+
+    def setFrame(self, image, generation):
+        """Show a frame rendered by the render engine unless a newer one is already shown"""
+        if generation <= self._frameGeneration:
+            return
+        self._frameGeneration = generation
+        image.setDevicePixelRatio(self.device_pixel_ratio)
+        self._frame = image
+        self._bufferReleased = False
+        if not self.stats is None and not self._submitTime is None:
+            self._recordDraw('async', time.perf_counter()-self._submitTime)
+            self._submitTime = None
+        self._invalidateThumbnails()
+        self.update()
+        if not self.bufferManager is None:
+            self.bufferManager.touch(self)
+
+    def _figureMatches(self, size):
+        """True if the figure already has the physical pixel size of a canvas of size, resizing to it needs no render"""
+        width, height = self.figure.bbox.size
+        ratio = self.device_pixel_ratio
+        return abs(width-size.width()*ratio) < 0.5 and abs(height-size.height()*ratio) < 0.5
+
+    def resizeEvent(self, event):
+        if self._figureMatches(event.size()):
+            # E.g. back at the rendered size after being reparented when docking, the buffer is still valid
+            self._resizeTimer.stop()
+            self._resizePreview = None
+            QtWidgets.QWidget.resizeEvent(self, event)
+            self.update()
+            return
+        if not self.isShown:
+            # Only the final size matters, the figure is resized when shown, see _resume
+            return QtWidgets.QWidget.resizeEvent(self, event)
+        if not self.resizeDelay:
+            return super().resizeEvent(event)
+        if self._resizePreview is None:
+            preview = self.snapshotSource()
+            if preview is None: # Nothing rendered to scale
+                return super().resizeEvent(event)
+            self._resizePreview = preview.copy() # The buffer itself is replaced by the next draw
+            self._resizeStartSize = event.oldSize()
+        # Only the widget is resized, the figure keeps its size until finishResize
+        QtWidgets.QWidget.resizeEvent(self, event)
+        self._resizeTimer.start(int(self.resizeDelay*1000))
+        self.update()
+
+    def finishResize(self):
+        """End scaling the last frame and render once at the current size"""
+        self._resizeTimer.stop()
+        if self._resizePreview is None:
+            return
+        self._resizePreview = None
+        if self._figureMatches(self.size()):
+            self.update()
+            return
+        super().resizeEvent(QtGui.QResizeEvent(self.size(), self._resizeStartSize))
+
+    def paintEvent(self, event):
+        if not self._resizePreview is None:
+            painter = QtGui.QPainter(self)
+            try:
+                painter.drawImage(QtCore.QRectF(self.rect()), self._resizePreview)
+            finally:
+                painter.end()
+        elif self.renderEngine is None:
+            super().paintEvent(event)
+        else:
+            self._draw_idle() # Only queues a render if a draw is pending
+            if not self._frame is None:
+                painter = QtGui.QPainter(self)
+                try:
+                    # The last good frame is stretched if the canvas was resized since it was rendered
+                    painter.drawImage(QtCore.QRectF(self.rect()), self._frame)
+                    self._draw_rect_callback(painter)
+                finally:
+                    painter.end()
+        if self.showStats and not self.stats is None:
+            self._paintStats()
+
+    def setShowStats(self, show):
+        """Show draw statistics in an overlay, which is painted on top of the buffer and never rendered by Agg"""
+        self.showStats = show
+        if show and self.stats is None:
+            from Instrumentation import CanvasStats
+            self.stats = CanvasStats()
+        self.update()
+
+    def _recordDraw(self, kind, seconds):
+        self.stats.recordDraw(kind, seconds)
+        if self.showStats:
+            self.update(self._statsRect) # Blits only repaint the changed axes
+
+    def _paintStats(self):
+        painter = QtGui.QPainter(self)
+        try:
+            text = self.stats.text(self)
+            metrics = painter.fontMetrics()
+            self._statsRect = QtCore.QRect(0, 0, metrics.horizontalAdvance(text)+8, metrics.height()+4)
+            painter.fillRect(self._statsRect, QtGui.QColor(0, 0, 0, 160))
+            painter.setPen(QtCore.Qt.white)
+            painter.drawText(self._statsRect, QtCore.Qt.AlignCenter, text)
+        finally:
+            painter.end()
+
+    @property
+    def artistCount(self):
+        """Number of artists in the figure, including ticks and text"""
+        return len(self.fig.findobj())
+
+    @property
+    def bufferBytes(self):
+        """Approximate number of bytes held by render buffers of the canvas"""
+        size = 0
+        if hasattr(self, 'renderer'):
+            size += int(self.renderer.width)*int(self.renderer.height)*4
+        if not self._frame is None:
+            size += self._frame.sizeInBytes()
+        for ax in self._backgrounds:
+            size += int(ax.bbox.width)*int(ax.bbox.height)*4
+        return size
+
+    def releaseBuffer(self, snapshot=True):
+        """Drop the Agg render buffer, it is re-rendered when the canvas is shown again
+
+        Kwargs:
+            - snapshot (bool): Keep a zlib compressed copy of the buffer in self.snapshot (default True)
+        """
+        if hasattr(self, 'renderer') or not self._frame is None:
+            if snapshot:
+                image = self.snapshotSource()
+                if not image is None:
+                    self.snapshot = (image.width(), image.height(), zlib.compress(image.constBits().asstring(image.sizeInBytes()), 1))
+            if hasattr(self, 'renderer'):
+                del self.renderer
+            self._lastKey = None
+            self._frame = None
+            self._frameGeneration = 0
+        self._backgrounds = {}
+        self._bufferReleased = True
+
+    def snapshotSource(self):
+        """QImage of the current render buffer without copying, None if nothing is rendered"""
+        if not self._frame is None:
+            return self._frame
+        if not hasattr(self, 'renderer'):
+            return None
+        w, h = int(self.renderer.width), int(self.renderer.height)
+        # The QImage only wraps the buffer, it is valid until the next draw
+        return QtGui.QImage(self.buffer_rgba(), w, h, QtGui.QImage.Format_RGBA8888)
+
+    def thumbnail(self, maxSize=None, opacity=1.0):
+        """Downscaled QImage of the last rendered frame, cached until the figure redraws
+
+        The render buffer is wrapped without copying and only the downscaled
+        image is allocated. If the buffer was released, the compressed
+        snapshot is used. Returns None if the canvas has never been rendered.
+
+        Kwargs:
+            - maxSize (QSize): Maximal size of the thumbnail. If None, thumbnailSize is used (default None)
+            - opacity (float): Opacity of the thumbnail (default 1.0)
+        """
+        if maxSize is None:
+            maxSize = self.thumbnailSize
+        key = (maxSize.width(), maxSize.height(), opacity)
+        if key in self._thumbnails:
+            return self._thumbnails[key]
+
+        source = self.snapshotSource()
+        if source is None:
+            source = self.snapshotImage()
+        if source is None:
+            return None
+        image = source.scaled(maxSize, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        if opacity < 1.0:
+            faded = QtGui.QImage(image.size(), QtGui.QImage.Format_ARGB32_Premultiplied)
+            faded.fill(QtCore.Qt.transparent)
+            painter = QtGui.QPainter(faded)
+            painter.setOpacity(opacity)
+            painter.drawImage(0, 0, image)
+            painter.end()
+            image = faded
+        image.setDevicePixelRatio(1.0)
+        self._thumbnails[key] = image
+        return image
+
+    def _invalidateThumbnails(self):
+        self._thumbnails = {}
+        self.frameChanged.emit()
+
+    def snapshotImage(self):
+        """QImage of the compressed snapshot kept when the buffer was released, None if there is none"""
+        if self.snapshot is None:
+            return None
+        w, h, data = self.snapshot
+        return QtGui.QImage(zlib.decompress(data), w, h, QtGui.QImage.Format_RGBA8888).copy()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._watchWindow()
+        if self._bufferReleased:
+            self.draw_idle()
+        self._updateShown()
+        if not self.bufferManager is None:
+            self.bufferManager.shown(self)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._updateShown()
+        self._unwatchWindow() # Watched again once shown
+        if not self.bufferManager is None:
+            self.bufferManager.hidden(self)
+
+    def plotDecimated(self, x, y, axes=None, **kwargs):
+        """Plot a large line of which only a per-pixel min/max reduction of the current view is rendered
+
+        Args:
+            - x (array): Sorted x values. If None, the sample index is used
+            - y (array): y values
+
+        Kwargs:
+            - axes (Axes): Axes to plot in. If None, self.axes is used (default None)
+
+        Remaining kwargs are passed on to axes.plot.
+
+        Returns:
+            - DecimatedLine
+        """
+        if axes is None:
+            axes = self.axes
+        line = DecimatedLine(axes, x, y, **kwargs)
+        self.decimatedLines.append(line)
+        return line
+
+    def clearAxes(self, axes=None):
+        """Remove all plotted data, including decimated lines and streams, from axes
+
+        Kwargs:
+            - axes (Axes): Axes to clear. If None, self.axes is used (default None)
+        """
+        if axes is None:
+            axes = self.axes
+        for line in [line for line in self.decimatedLines if line.axes is axes]:
+            line.remove()
+            self.decimatedLines.remove(line)
+        for image in [image for image in self.pyramidImages if image.axes is axes]:
+            image.remove()
+            self.pyramidImages.remove(image)
+        for scatter in [scatter for scatter in self.densityScatters if scatter.axes is axes]:
+            scatter.remove()
+            self.densityScatters.remove(scatter)
+        self.streams = [stream for stream in self.streams if not stream.axes is axes]
+        self._backgrounds.pop(axes, None)
+        axes.cla()
+
+    def plotImage(self, image, axes=None, cacheDir=None, **kwargs):
+        """Show a large image of which only the tiles of the pyramid level matching the view are rendered
+
+        Args:
+            - image (array or ImagePyramid): 2D or 3D (colour) image, memory mapped arrays are read on demand
+
+        Kwargs:
+            - axes (Axes): Axes to plot in. If None, self.axes is used (default None)
+            - cacheDir (str): Directory to store and reuse pyramid levels in. If None, levels are kept in memory (default None)
+
+        Remaining kwargs are passed on to axes.imshow.
+
+        Returns:
+            - PyramidImage
+        """
+        if axes is None:
+            axes = self.axes
+        pyramidImage = PyramidImage(axes, image, cacheDir=cacheDir, **kwargs)
+        self.pyramidImages.append(pyramidImage)
+        return pyramidImage
+
+    def plotDensity(self, x, y, axes=None, **kwargs):
+        """Scatter plot drawn as a per-pixel histogram while more than maxMarkers points are visible
+
+        Args:
+            - x (array): x values
+            - y (array): y values
+
+        Kwargs:
+            - axes (Axes): Axes to plot in. If None, self.axes is used (default None)
+
+        Remaining kwargs, e.g. maxMarkers, cmap and norm, are passed on to DensityScatter.
+
+        Returns:
+            - DensityScatter
+        """
+        if axes is None:
+            axes = self.axes
+        scatter = DensityScatter(axes, x, y, **kwargs)
+        self.densityScatters.append(scatter)
+        return scatter
+
+    def plotSource(self, source, axes=None, **kwargs):
+        """Plot a data source, e.g. a MemmapSource, reading only what the current view needs
+
+        Args:
+            - source (MemmapSource): Source providing x, y and maxSamplesPerPixel
+
+        Kwargs:
+            - axes (Axes): Axes to plot in. If None, self.axes is used (default None)
+
+        Remaining kwargs are passed on to axes.plot.
+
+        Returns:
+            - DecimatedLine
+        """
+        if axes is None:
+            axes = self.axes
+        line = DecimatedLine(axes, source.x, source.y, maxSamplesPerPixel=source.maxSamplesPerPixel, **kwargs)
+        line.source = source # Kept such that a saved session refers to the file instead of copying it
+        self.decimatedLines.append(line)
+        return line
+
+    def addStream(self, axes=None, maxLength=None, **kwargs):
+        """Add a line fed by appended samples
+
+        Kwargs:
+            - axes (Axes): Axes to plot in. If None, self.axes is used (default None)
+            - maxLength (int): Only keep the newest maxLength samples. If None, all are kept (default None)
+
+        Remaining kwargs are passed on to axes.plot.
+
+        Returns:
+            - StreamingLine
+        """
+        if axes is None:
+            axes = self.axes
+        stream = StreamingLine(axes, maxLength=maxLength, **kwargs)
+        self.streams.append(stream)
+        return stream
+
+    def appendData(self, stream, y, x=None):
+        """Append single or batched samples to stream and schedule a redraw
+
+        Redraws are merged such that at most maxFps are performed per second.
+        """
+        stream.append(y, x=x)
+        self._scheduleStreamUpdate()
+
+    def _scheduleStreamUpdate(self):
+        if self._streamTimer.isActive() or not self.isShown: # Flushed when shown again
+            return
+        if self.maxFps is None or self.maxFps <= 0:
+            delay = 0
+        else:
+            elapsed = time.perf_counter()-self._lastStreamDraw
+            delay = max(0.0, 1.0/self.maxFps-elapsed)
+        self._streamTimer.start(int(delay*1000))
+
+    def flushStreams(self):
+        """Merge queued samples into their lines and redraw the changed axes, queued samples are kept while not shown"""
+        if not self.isShown:
+            return
+        changed = [stream for stream in self.streams if stream.flush()]
+        if not changed:
+            return
+        self._lastStreamDraw = time.perf_counter()
+
+        changedAxes = []
+        rescale = False
+        for stream in changed:
+            if not stream.axes in changedAxes:
+                changedAxes.append(stream.axes)
+            if not stream.newDataInsideView():
+                rescale = True
+
+        if rescale or self._deferredDraw or self._draw_pending or self.renderEngine is not None or any(not ax in self._backgrounds for ax in changedAxes):
+            # Limits or background changed, a full draw is needed. The streams
+            # are drawn on top of the fresh backgrounds by _on_draw
+            for ax in changedAxes:
+                ax.relim()
+                ax.autoscale_view()
+                # Leave headroom along x such that a growing stream does not
+                # force a full draw on every update
+                xmin, xmax = ax.get_xlim()
+                ax.set_xlim(xmin, xmax+self.streamHeadroom*(xmax-xmin))
+            self.draw()
+        else:
+            self._blitAxes(changedAxes)
+
+    def _blitAxes(self, axesList):
+        """Redraw only the animated artists of the given axes onto their cached background"""
+        start = time.perf_counter()
+        for ax in axesList:
+            self.restore_region(self._backgrounds[ax])
+            self._drawAnimated(ax)
+            self.blit(ax.bbox)
+        self._invalidateThumbnails()
+        if not self.stats is None:
+            self._recordDraw('blit', time.perf_counter()-start)
+
+    def _drawAnimated(self, ax=None, renderer=None):
+        """Draw animated artists of ax (all axes if None) onto renderer (the canvas renderer if None)"""
+        for stream in self.streams:
+            if ax is None or stream.axes is ax:
+                if renderer is None:
+                    stream.axes.draw_artist(stream.line)
+                else:
+                    stream.line.draw(renderer)
+
+    def _on_resize(self, event):
+        # Cached backgrounds no longer match the canvas, wait for the next draw
+        self._backgrounds = {}
+
+    def _on_draw(self, event):
+        if event.renderer is not getattr(self, 'renderer', None):
+            return # Drawn by the render engine, which draws animated artists itself
+        self._bufferReleased = False
+        self._invalidateThumbnails()
+        if not self.bufferManager is None:
+            self.bufferManager.touch(self)
+        # Cache the background of each axes holding streams without the
+        # animated artists and put the animated ones back on top. Other axes
+        # are never blitted, copying their background would only cost memory
+        streamAxes = []
+        for stream in self.streams:
+            if not stream.axes in streamAxes:
+                streamAxes.append(stream.axes)
+        self._backgrounds = {ax:self.copy_from_bbox(ax.bbox) for ax in streamAxes}
+        for ax in streamAxes:
+            self._drawAnimated(ax)
+
+    @property
+    def dataBytes(self):
+        """Approximate number of bytes of data plotted in the figure"""
+        size = 0
+        for ax in self.fig.axes:
+            for line in ax.lines:
+                size += np.asarray(line.get_xdata(orig=True)).nbytes+np.asarray(line.get_ydata(orig=True)).nbytes
+            for image in ax.images:
+                array = image.get_array()
+                if not array is None:
+                    size += array.nbytes
+            for collection in ax.collections:
+                size += np.asarray(collection.get_offsets()).nbytes
+        for line in self.decimatedLines: # Full resolution data is not held by the artists
+            for array in [line.x, line.y]:
+                if not array is None and not isinstance(array, np.memmap):
+                    size += array.nbytes
+        for image in self.pyramidImages: # Crops of the pyramid are counted as images above
+            if not isinstance(image.data, np.memmap):
+                size += image.data.nbytes
+            size += image.pyramid.nbytes
+        for scatter in self.densityScatters: # Only the visible markers are held by the artists
+            size += scatter.x.nbytes+scatter.y.nbytes
+        for stream in self.streams:
+            size += stream.x.nbytes+stream.y.nbytes
+        return size
+
+    def release(self):
+        """Free render buffers and figure content and schedule the widget for deletion
+
+        The figure was never registered with pyplot, so plt.close cannot free
+        it. Instead everything the canvas holds is dropped explicitly.
+        """
+        self._streamTimer.stop()
+        self._resizeTimer.stop()
+        self._resumeTimer.stop()
+        self._unwatchWindow()
+        self._resizePreview = None
+        for timer in self._animationTimers:
+            if not sip.isdeleted(timer._timer):
+                timer.stop()
+        self._pausedTimers = []
+        if not self.renderEngine is None:
+            self.renderEngine.forget(self)
+            self.renderEngine = None
+        if not self.bufferManager is None:
+            self.bufferManager.unregister(self)
+        self.releaseBuffer(snapshot=False)
+        self.snapshot = None
+        self.streams = []
+        self.decimatedLines = []
+        for image in self.pyramidImages:
+            image.pyramid.cancel()
+        self.pyramidImages = []
+        self.densityScatters = []
+        self.fig.clear()
+        self.close()
+        self.deleteLater()
@@ -0,0 +1,116 @@
+from PyQt5 import QtCore, QtGui, sip
+from PyQt5.QtCore import pyqtSignal, pyqtSlot
+
+from matplotlib.backends.backend_agg import RendererAgg
+
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import threading
+import traceback
+
+
+class RenderEngine(QtCore.QObject):
+    """Render figures of MplCanvas objects outside of the GUI thread.
+
+    Each request draws the figure into a fresh RendererAgg in a worker thread
+    and converts the RGBA buffer into a QImage, which is handed back to the
+    canvas in the GUI thread through the frameReady signal. Only the newest
+    request per canvas is of interest: queued requests are cancelled when a
+    newer one arrives and a request that became stale before starting is
+    skipped. At most one render per canvas runs at a time, a request arriving
+    while one is running is submitted once the running one is done.
+
+    Matplotlib artists are not thread safe. Changing a figure while it is
+    rendered can give a torn frame or an exception in the worker, in both cases
+    the change itself queues a newer render which supersedes the broken one.
+    """
+    frameReady = pyqtSignal(object, int, object) # canvas, generation, QImage
+
+    def __init__(self, maxWorkers=None, parent=None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix='RenderEngine')
+        self._futures = {}
+        self._generations = {}
+        self._dirty = {} # id(canvas) -> canvas requested while its render was running
+        self._lock = threading.RLock() # Cancelling a future calls its done callback right away
+        self.frameReady.connect(self._on_frame_ready)
+
+    def submit(self, canvas):
+        """Queue a render of canvas, cancelling any queued render of it not yet started
+
+        If a render of canvas is running, the new one is only submitted once
+        it is done, as figures cannot be drawn by two threads at once.
+        """
+        w, h = canvas.get_width_height(physical=True)
+        if w <= 0 or h <= 0:
+            return
+        with self._lock:
+            generation = self._generations.get(id(canvas), 0)+1
+            self._generations[id(canvas)] = generation
+            previous = self._futures.get(id(canvas))
+            if previous is not None and not previous.cancel() and not previous.done():
+                self._dirty[id(canvas)] = canvas # Submitted by _on_done
+                return
+            self._futures.pop(id(canvas), None)
+            future = self._executor.submit(self._render, canvas, generation, w, h, canvas.figure.dpi)
+            self._futures[id(canvas)] = future
+            future.add_done_callback(functools.partial(self._on_done, canvas))
+
+    def _on_done(self, canvas, future):
+        # Called in the worker thread, or right away for cancelled futures
+        with self._lock:
+            if not self._futures.get(id(canvas)) is future:
+                return
+            del self._futures[id(canvas)]
+            if self._dirty.pop(id(canvas), None) is None:
+                return
+        try:
+            self.submit(canvas)
+        except RuntimeError: # The executor was shut down meanwhile, e.g. at exit
+            pass
+
+    def isPending(self, canvas):
+        future = self._futures.get(id(canvas))
+        return future is not None and not future.done()
+
+    def forget(self, canvas):
+        """Drop all bookkeeping of canvas, e.g. when it is deleted"""
+        with self._lock:
+            future = self._futures.pop(id(canvas), None)
+            if future is not None:
+                future.cancel()
+            self._generations.pop(id(canvas), None)
+            self._dirty.pop(id(canvas), None)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+            self._futures = {}
+            self._dirty = {}
+        self._executor.shutdown(wait=wait)
+
+    def _isStale(self, canvas, generation):
+        return self._generations.get(id(canvas)) != generation
+
+    def _render(self, canvas, generation, w, h, dpi):
+        if self._isStale(canvas, generation):
+            return
+        try:
+            renderer = RendererAgg(w, h, dpi)
+            canvas.figure.draw(renderer)
+            canvas._drawAnimated(renderer=renderer)
+            # The QImage is copied such that it owns its data independently of the renderer
+            image = QtGui.QImage(renderer.buffer_rgba(), w, h, QtGui.QImage.Format_RGBA8888).copy()
+        except Exception:
+            if not self._isStale(canvas, generation):
+                traceback.print_exc()
+            return
+        self.frameReady.emit(canvas, generation, image)
+
+    @pyqtSlot(object, int, object)
+    def _on_frame_ready(self, canvas, generation, image):
+        if sip.isdeleted(canvas):
+            self.forget(canvas)
+            return
+        canvas.setFrame(image, generation)
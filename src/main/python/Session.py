@@ -0,0 +1,310 @@
+import functools
+import json
+import os
+from os import path
+
+import numpy as np
+from matplotlib.colors import LogNorm, to_hex
+
+from DataSource import MemmapSource
+
+
+# A session is a single .npz archive. The member 'session' holds the layout as
+# UTF-8 encoded JSON: tabs in order, detached windows with their geometry,
+# axes state and lines. Every data array is a separate member referenced by
+# name from the JSON, such that np.load only reads the arrays of a tab when
+# the tab is first shown. Memory mapped sources are stored by file name.
+
+sessionVersion = 1
+styleProperties = ['color', 'linestyle', 'linewidth', 'marker', 'markersize', 'alpha', 'label', 'zorder']
+
+
+class ArchiveWriter(object):
+    """Collects the arrays of plot states, which refer to them by member name"""
+    def __init__(self):
+        self.arrays = {}
+
+    def add(self, array):
+        """Store array and return the name of its member, None is kept as None"""
+        if array is None:
+            return None
+        key = 'a{}'.format(len(self.arrays))
+        self.arrays[key] = array
+        return key
+
+
+def _lineStyle(line):
+    style = {}
+    for name in styleProperties:
+        value = getattr(line, 'get_'+name)()
+        if name == 'color':
+            value = to_hex(value, keep_alpha=True)
+        elif name == 'label' and value.startswith('_'): # Generated labels are not restored
+            continue
+        style[name] = value
+    return style
+
+
+def _axesState(ax):
+    return {'position':list(ax.get_position().bounds), 'xlim':list(map(float, ax.get_xlim())),
+            'ylim':list(map(float, ax.get_ylim())), 'xscale':ax.get_xscale(), 'yscale':ax.get_yscale(),
+            'title':ax.get_title(), 'xlabel':ax.get_xlabel(), 'ylabel':ax.get_ylabel()}
+
+
+def _sourceState(source):
+    return {'kind':'source', 'fileName':path.abspath(source.fileName), 'options':source.options}
+
+
+def _canvasState(canvas, writer):
+    """Lines and axes state of a realized canvas"""
+    axesList = canvas.fig.axes
+    lines = []
+    special = set()
+    for line in canvas.decimatedLines:
+        special.add(line.line)
+        source = getattr(line, 'source', None)
+        if not source is None:
+            state = _sourceState(source)
+        else:
+            state = {'kind':'decimated', 'x':writer.add(line.x), 'y':writer.add(line.y),
+                     'maxSamplesPerPixel':line.maxSamplesPerPixel}
+        state.update({'axes':axesList.index(line.axes), 'style':_lineStyle(line.line)})
+        lines.append(state)
+    for image in canvas.pyramidImages:
+        lines.append({'kind':'image', 'axes':axesList.index(image.axes), 'data':writer.add(image.data),
+                      'style':{'cmap':image.artist.get_cmap().name}})
+    for scatter in canvas.densityScatters:
+        lines.append({'kind':'density', 'axes':axesList.index(scatter.axes), 'x':writer.add(scatter.x), 'y':writer.add(scatter.y),
+                      'maxMarkers':scatter.maxMarkers, 'binSize':scatter.binSize,
+                      'norm':'log' if isinstance(scatter.image.norm, LogNorm) else 'linear',
+                      'style':{'cmap':scatter.image.get_cmap().name}})
+    for stream in canvas.streams:
+        special.add(stream.line)
+        lines.append({'kind':'stream', 'axes':axesList.index(stream.axes), 'x':writer.add(np.array(stream.x)),
+                      'y':writer.add(np.array(stream.y)), 'maxLength':stream.maxLength, 'style':_lineStyle(stream.line)})
+    for number, ax in enumerate(axesList):
+        for line in ax.lines:
+            if line in special:
+                continue
+            lines.append({'kind':'line', 'axes':number, 'x':writer.add(np.asarray(line.get_xdata(orig=True))),
+                          'y':writer.add(np.asarray(line.get_ydata(orig=True))), 'style':_lineStyle(line)})
+    return {'axes':[_axesState(ax) for ax in axesList], 'lines':lines}
+
+
+def _placeholderState(canvasFactory, writer):
+    """State of a tab which has not been shown, taken from its canvas factory without building it"""
+    keywords = canvasFactory.keywords
+    setup = keywords.get('setup')
+    if isinstance(setup, functools.partial) and setup.func is restoreCanvas:
+        # Restored from an earlier session and not shown since, copy its arrays over
+        archive, state = setup.args
+        state = json.loads(json.dumps(state))
+        for line in state['lines']:
+            for key in ['x', 'y', 'data']:
+                if not line.get(key) is None:
+                    line[key] = writer.add(archive[line[key]])
+        return state
+
+    if not keywords.get('source') is None:
+        lines = [_sourceState(keywords['source'])]
+    elif not keywords.get('y') is None and keywords.get('scatter'):
+        y = np.asarray(keywords['y'])
+        x = np.arange(len(y)) if keywords.get('x') is None else keywords['x']
+        lines = [{'kind':'density', 'x':writer.add(x), 'y':writer.add(y), 'maxMarkers':10000, 'binSize':1, 'norm':'log'}]
+    elif not keywords.get('y') is None:
+        lines = [{'kind':'decimated' if keywords.get('decimate') else 'line', 'x':writer.add(keywords.get('x')),
+                  'y':writer.add(np.asarray(keywords['y'])), 'maxSamplesPerPixel':None}]
+    elif not keywords.get('image') is None:
+        lines = [{'kind':'image', 'data':writer.add(np.asarray(keywords['image']))}]
+    elif keywords.get('streaming'):
+        lines = []
+    else:
+        return {'random':True}
+    for line in lines:
+        line.update({'axes':0, 'style':{}})
+    return {'axes':[], 'lines':lines}
+
+
+def plotState(tab, writer):
+    """State of the plot of a Mpltab, its arrays are added to writer. Placeholder tabs are not built"""
+    if tab.realized:
+        return _canvasState(tab.canvas, writer)
+    if tab.loading: # Its data is not there yet, saved as an empty plot
+        return {'axes':[], 'lines':[]}
+    return _placeholderState(tab.canvasFactory, writer)
+
+
+def _restoredSetup(tab):
+    """The restoreCanvas partial of a placeholder restored from a session and not shown since, otherwise None"""
+    if tab.realized or tab.loading:
+        return None
+    setup = tab.canvasFactory.keywords.get('setup')
+    if isinstance(setup, functools.partial) and setup.func is restoreCanvas:
+        return setup
+    return None
+
+
+def _archiveFileName(archive):
+    """Normalized path of the file an archive of np.load reads from, None for other mappings"""
+    fid = getattr(archive, 'fid', None)
+    if fid is None or not isinstance(getattr(fid, 'name', None), str):
+        return None
+    return path.normcase(path.abspath(fid.name))
+
+
+def _setRestoredSetup(tab, archive, state):
+    """Let a restored placeholder read its arrays from archive"""
+    factory = tab.canvasFactory
+    keywords = dict(factory.keywords, setup=functools.partial(restoreCanvas, archive, state))
+    tab.canvasFactory = functools.partial(factory.func, *factory.args, **keywords)
+
+
+def saveSession(tabWidget, fileName, compress=False):
+    """Save all tabs of tabWidget, docked and detached, to fileName
+
+    Plots which were never shown are saved without building them. Artists
+    other than lines, density scatters and images shown through plotImage are
+    not saved.
+
+    Args:
+        - tabWidget (DetachableTabWidget): Tab widget to save
+        - fileName (str): Path of the archive, '.npz' is appended if missing
+
+    Kwargs:
+        - compress (bool): Deflate the arrays, smaller but slower to save and restore (default False)
+
+    Returns:
+        - str: Path of the archive
+    """
+    if not fileName.endswith('.npz'):
+        fileName += '.npz'
+    writer = ArchiveWriter()
+    docked = [tabWidget.widget(index) for index in range(tabWidget.count())]
+    detached = [entry.tab for entry in tabWidget.plots.entries() if not entry.tab in docked]
+
+    target = path.normcase(path.abspath(fileName))
+    rebound = [] # (tab, state in the old archive, state in the new archive) of placeholders reading from fileName
+    tabs = []
+    for tab in docked+detached:
+        state = plotState(tab, writer)
+        setup = _restoredSetup(tab)
+        if not setup is None and _archiveFileName(setup.args[0]) == target:
+            rebound.append((tab, setup.args[1], state))
+        if tab.docked:
+            state['name'] = tabWidget.tabText(tabWidget.indexOf(tab))
+            state['geometry'] = None
+        else:
+            window = tab.parent()
+            state['name'] = window.windowTitle()
+            geometry = window.geometry()
+            state['geometry'] = [geometry.x(), geometry.y(), geometry.width(), geometry.height()]
+        tabs.append(state)
+
+    session = {'version':sessionVersion, 'current':tabWidget.currentIndex(), 'tabs':tabs}
+    writer.arrays['session'] = np.frombuffer(json.dumps(session).encode('utf-8'), dtype=np.uint8)
+
+    # Written next to the target and moved in place. Windows cannot replace a
+    # file which is open, so archives of fileName still read by not yet shown
+    # tabs are closed first and these tabs read from the new file afterwards,
+    # or from the old one again if it could not be replaced
+    temporary = fileName+'.tmp'
+    with open(temporary, 'wb') as f:
+        (np.savez_compressed if compress else np.savez)(f, **writer.arrays)
+    for tab, _, _ in rebound:
+        _restoredSetup(tab).args[0].close()
+    replaced = False
+    try:
+        os.replace(temporary, fileName)
+        replaced = True
+    finally:
+        if rebound:
+            archive = np.load(fileName, allow_pickle=False)
+            for tab, oldState, newState in rebound:
+                _setRestoredSetup(tab, archive, newState if replaced else oldState)
+    return fileName
+
+
+def restoreCanvas(archive, state, canvas):
+    """Build the plots of a saved tab on canvas, its arrays are read from archive, or any mapping of member names, now"""
+    def array(key):
+        return None if key is None else archive[key]
+
+    axesList = [canvas.axes]
+    for axesState in state['axes'][1:]:
+        axesList.append(canvas.fig.add_axes(axesState['position']))
+    if state['axes']:
+        canvas.axes.set_position(state['axes'][0]['position'])
+
+    for line in state['lines']:
+        ax = axesList[line['axes']]
+        style = line['style']
+        if line['kind'] == 'source':
+            canvas.plotSource(MemmapSource(line['fileName'], **line['options']), axes=ax, **style)
+        elif line['kind'] == 'decimated':
+            canvas.plotDecimated(array(line['x']), array(line['y']), axes=ax,
+                                 maxSamplesPerPixel=line['maxSamplesPerPixel'], **style)
+        elif line['kind'] == 'density':
+            canvas.plotDensity(array(line['x']), array(line['y']), axes=ax, maxMarkers=line['maxMarkers'],
+                               binSize=line['binSize'], norm=line['norm'], **style)
+        elif line['kind'] == 'image':
+            canvas.plotImage(array(line['data']), axes=ax, **style)
+        elif line['kind'] == 'stream':
+            stream = canvas.addStream(axes=ax, maxLength=line['maxLength'], **style)
+            y = array(line['y'])
+            if len(y):
+                canvas.appendData(stream, y, x=array(line['x']))
+        else:
+            x, y = array(line['x']), array(line['y'])
+            if x is None:
+                ax.plot(y, **style)
+            else:
+                ax.plot(x, y, **style)
+
+    for ax, axesState in zip(axesList, state['axes']):
+        ax.set_xscale(axesState['xscale'])
+        ax.set_yscale(axesState['yscale'])
+        ax.set_title(axesState['title'])
+        ax.set_xlabel(axesState['xlabel'])
+        ax.set_ylabel(axesState['ylabel'])
+        ax.set_xlim(axesState['xlim'])
+        ax.set_ylim(axesState['ylim'])
+
+
+def restoreSession(tabWidget, fileName):
+    """Add the tabs and detached windows saved in fileName to tabWidget
+
+    Tabs are created as placeholders, the arrays of a tab are only read from
+    the archive when it is first shown. Detached windows are shown, and hence
+    loaded, right away.
+
+    Args:
+        - tabWidget (DetachableTabWidget): Tab widget to add the tabs to
+        - fileName (str): Path of the archive
+
+    Returns:
+        - list of Mpltab in saved order
+    """
+    from PyQt5 import QtCore
+
+    archive = np.load(fileName, allow_pickle=False)
+    session = json.loads(archive['session'].tobytes().decode('utf-8'))
+    if session.get('version') != sessionVersion:
+        raise AttributeError('Unsupported session version {} in {}'.format(session.get('version'), fileName))
+
+    specs = []
+    for state in session['tabs']:
+        spec = {'tabName':state['name']}
+        if not state.get('random'):
+            spec['setup'] = functools.partial(restoreCanvas, archive, state)
+        specs.append(spec)
+    current = session['current']
+    dockedCount = sum(1 for state in session['tabs'] if state['geometry'] is None)
+    tabs = tabWidget.addtabs(specs, lazy=True, current=current if 0 <= current < dockedCount else None)
+
+    for tab, state in zip(tabs, session['tabs']):
+        if state['geometry'] is None:
+            continue
+        x, y, width, height = state['geometry']
+        tabWidget.detachTab(tab.tabId, QtCore.QPoint(x, y))
+        tab.parent().setGeometry(x, y, width, height)
+    return tabs
@@ -0,0 +1,92 @@
+from os import environ
+import json
+import sys
+import time
+
+
+class StartupProfile(object):
+    """Opt-in timing of the application start.
+
+    Enabled by setting the environment variable GUIMATPLOTLIB_PROFILE_STARTUP
+    or passing --profile-startup on the command line. The report is printed to
+    stderr, if the environment variable holds a file name ending in .json the
+    timings are also written there for comparison between releases.
+
+    Time is recorded as named marks, each section is the time from the
+    previous mark. Marks are no-ops when profiling is disabled.
+    """
+    environmentVariable = 'GUIMATPLOTLIB_PROFILE_STARTUP'
+    flag = '--profile-startup'
+
+    def __init__(self, enabled=False, start=None, outputFile=None):
+        self.enabled = enabled
+        self.outputFile = outputFile
+        self.start = time.perf_counter() if start is None else start
+        self.marks = []
+        self._reported = False
+
+    @classmethod
+    def fromEnvironment(cls, argv=None, start=None):
+        """Create profile enabled by environment variable or command line flag. The flag is removed from argv"""
+        if argv is None:
+            argv = sys.argv
+        value = environ.get(cls.environmentVariable, '')
+        enabled = value not in ['', '0']
+        if cls.flag in argv:
+            argv.remove(cls.flag)
+            enabled = True
+        outputFile = value if value.endswith('.json') else None
+        return cls(enabled=enabled, start=start, outputFile=outputFile)
+
+    def mark(self, name):
+        if self.enabled:
+            self.marks.append((name, time.perf_counter()))
+
+    def sections(self):
+        """List of (name, seconds) of time spent since the previous mark"""
+        previous = self.start
+        sections = []
+        for name, stamp in self.marks:
+            sections.append((name, stamp-previous))
+            previous = stamp
+        return sections
+
+    def watchFirstPaint(self, app):
+        """Mark the first paint event of any widget in app and report afterwards"""
+        if not self.enabled:
+            return
+        from PyQt5 import QtCore
+
+        profile = self
+        class FirstPaintFilter(QtCore.QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QtCore.QEvent.Paint:
+                    app.removeEventFilter(self)
+                    # Report once the paint event has been handled
+                    QtCore.QTimer.singleShot(0, profile._on_first_paint)
+                return False
+
+        self._firstPaintFilter = FirstPaintFilter(app)
+        app.installEventFilter(self._firstPaintFilter)
+
+    def _on_first_paint(self):
+        self.mark('first paint')
+        self.report()
+
+    def report(self, stream=None):
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        if stream is None:
+            stream = sys.stderr
+        sections = self.sections()
+        total = sum(seconds for _, seconds in sections)
+        stream.write('Startup profile:\n')
+        for name, seconds in sections:
+            stream.write('  {:<28s}{:8.1f} ms\n'.format(name, 1000*seconds))
+        stream.write('  {:<28s}{:8.1f} ms\n'.format('total', 1000*total))
+
+        if not self.outputFile is None:
+            with open(self.outputFile, 'w') as f:
+                json.dump({'sections': [{'name':name, 'seconds':seconds} for name, seconds in sections],
+                           'total': total}, f, indent=2)
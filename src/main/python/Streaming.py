@@ -0,0 +1,174 @@
+import numpy as np
+
+
+class _GrowingBuffer(object):
+    """Append-only float buffer with amortised O(1) appends.
+
+    If maxLength is given only the newest maxLength samples are kept, the
+    buffer is compacted when its spare capacity is used up."""
+    def __init__(self, maxLength=None, capacity=1024):
+        self.maxLength = maxLength
+        if maxLength is not None:
+            capacity = 2*maxLength
+        self._data = np.empty(capacity, dtype=float)
+        self._start = 0
+        self._stop = 0
+
+    def __len__(self):
+        return self._stop-self._start
+
+    @property
+    def data(self):
+        """View (no copy) of the stored samples"""
+        return self._data[self._start:self._stop]
+
+    def clear(self):
+        self._start = 0
+        self._stop = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if self.maxLength is not None and len(values) > self.maxLength:
+            values = values[-self.maxLength:]
+        n = len(values)
+
+        if self._stop+n > len(self._data):
+            keep = self.data
+            if self.maxLength is not None:
+                keep = keep[max(0, len(keep)+n-self.maxLength):]
+                capacity = len(self._data)
+            else:
+                capacity = max(2*len(self._data), len(keep)+n)
+            newData = np.empty(capacity, dtype=float) if capacity != len(self._data) else self._data
+            newData[:len(keep)] = keep # overlapping copies within one array are safe for numpy
+            self._data = newData
+            self._start = 0
+            self._stop = len(keep)
+
+        self._data[self._stop:self._stop+n] = values
+        self._stop += n
+        if self.maxLength is not None and len(self) > self.maxLength:
+            self._start = self._stop-self.maxLength
+
+
+class StreamingLine(object):
+    """Line artist fed with appended samples.
+
+    Samples given to append are only queued, they are merged into the line
+    when the owning MplCanvas flushes its streams. The line is animated, i.e.
+    it is excluded from normal draws and drawn by blitting on top of the
+    cached background of its axes."""
+    def __init__(self, axes, maxLength=None, **kwargs):
+        self.axes = axes
+        self.line, = axes.plot([], [], animated=True, **kwargs)
+        self.maxLength = maxLength
+
+        self._x = _GrowingBuffer(maxLength=maxLength)
+        self._y = _GrowingBuffer(maxLength=maxLength)
+        self._pendingX = []
+        self._pendingY = []
+        self._pendingLength = 0
+        self._sampleCount = 0 # Used to generate x values if none are given
+        self._replace = False # Queued samples replace the line instead of being appended, see setData
+        self._lastX = self._lastY = np.empty(0)
+
+    def __len__(self):
+        return len(self._y)
+
+    @property
+    def x(self):
+        return self._x.data
+
+    @property
+    def y(self):
+        return self._y.data
+
+    @property
+    def pending(self):
+        return len(self._pendingY) > 0
+
+    def append(self, y, x=None):
+        """Queue a single sample or a batch of samples
+
+        Args:
+            - y (float or array): New y value(s)
+
+        Kwargs:
+            - x (float or array): New x value(s). If None, the running sample number is used (default None)
+        """
+        y = np.atleast_1d(np.asarray(y, dtype=float)).ravel()
+        if x is None:
+            x = np.arange(self._sampleCount, self._sampleCount+len(y), dtype=float)
+        else:
+            x = np.atleast_1d(np.asarray(x, dtype=float)).ravel()
+            if len(x) != len(y):
+                raise AttributeError('Length of x ({}) does not match length of y ({})'.format(len(x), len(y)))
+        self._sampleCount += len(y)
+
+        self._pendingX.append(x)
+        self._pendingY.append(y)
+        self._pendingLength += len(y)
+        if not self.maxLength is None and self._pendingLength > 2*self.maxLength:
+            # Not flushed for a while, e.g. while hidden, drop queued samples which would not be kept anyway
+            self._pendingX = [np.concatenate(self._pendingX)[-self.maxLength:]]
+            self._pendingY = [np.concatenate(self._pendingY)[-self.maxLength:]]
+            self._pendingLength = self.maxLength
+
+    def setData(self, y, x=None):
+        """Queue samples replacing all samples of the line, e.g. for the latest block of a monitored signal
+
+        Args:
+            - y (array): New y values
+
+        Kwargs:
+            - x (array): New x values. If None, the sample number is used (default None)
+        """
+        self._pendingX = []
+        self._pendingY = []
+        self._pendingLength = 0
+        self._sampleCount = 0
+        self._replace = True
+        self.append(y, x=x)
+
+    def flush(self):
+        """Merge queued samples into the line artist. Returns True if anything changed"""
+        if not self.pending:
+            return False
+        if self._replace:
+            self._x.clear()
+            self._y.clear()
+            self._replace = False
+
+        self._lastX = np.concatenate(self._pendingX)
+        self._lastY = np.concatenate(self._pendingY)
+        self._x.extend(self._lastX)
+        self._y.extend(self._lastY)
+        self._pendingX = []
+        self._pendingY = []
+        self._pendingLength = 0
+
+        self.line.set_data(self.x, self.y)
+        return True
+
+    def clear(self):
+        self._x = _GrowingBuffer(maxLength=self.maxLength)
+        self._y = _GrowingBuffer(maxLength=self.maxLength)
+        self._pendingX = []
+        self._pendingY = []
+        self._pendingLength = 0
+        self._sampleCount = 0
+        self._replace = False
+        self._lastX = self._lastY = np.empty(0)
+        self.line.set_data([], [])
+
+    def newDataInsideView(self):
+        """Check if the samples merged by the last flush lie within the current axes limits.
+
+        Older samples are not checked, they were visible when they arrived and
+        are only outside the view if the user panned or zoomed away from them."""
+        if len(self._lastY) == 0:
+            return True
+        xmin, xmax = sorted(self.axes.get_xlim())
+        ymin, ymax = sorted(self.axes.get_ylim())
+        return bool(np.nanmin(self._lastX) >= xmin and np.nanmax(self._lastX) <= xmax and
+                    np.nanmin(self._lastY) >= ymin and np.nanmax(self._lastY) <= ymax)
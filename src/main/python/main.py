@@ -1,31 +1,51 @@
+import sys
+import time
+_startTime = time.perf_counter()
+
+from StartupProfile import StartupProfile
+startupProfile = StartupProfile.fromEnvironment(sys.argv, start=_startTime)
+
 from fbs_runtime.application_context.PyQt5 import ApplicationContext, \
     cached_property
+startupProfile.mark('import fbs_runtime')
 
 from MainWindow import MainWindow
-import sys
+startupProfile.mark('import MainWindow')
 
 class AppContext(ApplicationContext):
     def __init__(self,*args,**kwargs):
         super().__init__(*args,**kwargs)
+        startupProfile.mark('create QApplication')
 
-        
 
     def run(self):
         self.main_window.show()
-        
+        startupProfile.watchFirstPaint(self.app)
+        self.plot_server.listen()
+
         return self.app.exec_()
 
     @cached_property
     def main_window(self):
         self.app.AppContext = self
         res = MainWindow(self.app)
-        
+        startupProfile.mark('UI setup')
+
         return res # Pass context to the window.
 
+    @cached_property
+    def plot_server(self):
+        # Lets other processes plot into the tabs, see PlotServer.PlotClient
+        from PlotServer import PlotServer
+        return PlotServer(self.main_window.tabWidget, parent=self.main_window)
+
 def main():
     appctxt = AppContext()
     exit_code = appctxt.run()
     sys.exit(exit_code)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    if getattr(sys, 'frozen', False): # Worker processes of Export All start the frozen executable
+        import multiprocessing
+        multiprocessing.freeze_support()
+    main()